@@ -0,0 +1,37 @@
+"""Unique user role pairs
+
+Revision ID: 3b9c1f7d2a4e
+Revises: e298303695a6
+Create Date: 2026-10-17 00:40:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9c1f7d2a4e'
+down_revision: Union[str, Sequence[str], None] = 'e298303695a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Дубликаты могли появиться при назначении ролей вручную
+    op.execute(
+        'DELETE FROM user_role a USING user_role b '
+        'WHERE a.user_id = b.user_id AND a.role_id = b.role_id '
+        'AND a.ctid > b.ctid'
+    )
+    op.create_unique_constraint(
+        'uq_user_role_user_id_role_id', 'user_role', ['user_id', 'role_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        'uq_user_role_user_id_role_id', 'user_role', type_='unique'
+    )
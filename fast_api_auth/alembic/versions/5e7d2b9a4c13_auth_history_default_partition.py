@@ -0,0 +1,40 @@
+"""Default partition for auth history
+
+Revision ID: 5e7d2b9a4c13
+Revises: c27f5a9e1d36
+Create Date: 2026-10-17 02:10:37.514208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7d2b9a4c13'
+down_revision: Union[str, Sequence[str], None] = 'c27f5a9e1d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Принимает записи месяцев без партиции, если обслуживание отстало;
+    # MonthlyPartitionManager переносит их в месячные партиции
+    op.execute(
+        'CREATE TABLE auth_history_default PARTITION OF auth_history DEFAULT'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM auth_history_default) THEN
+                RAISE EXCEPTION 'auth_history_default is not empty: '
+                    'run partition maintenance before downgrading';
+            END IF;
+        END $$
+    """)
+    op.execute('DROP TABLE auth_history_default')
@@ -0,0 +1,39 @@
+"""Auth history user timestamp index
+
+Revision ID: 8d41e0c5b7a2
+Revises: 3b9c1f7d2a4e
+Create Date: 2026-10-17 00:52:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e0c5b7a2'
+down_revision: Union[str, Sequence[str], None] = '3b9c1f7d2a4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись истории входов на время построения
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_auth_history_user_id_timestamp',
+            'auth_history',
+            ['user_id', 'timestamp'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_auth_history_user_id_timestamp',
+            table_name='auth_history',
+            postgresql_concurrently=True,
+        )
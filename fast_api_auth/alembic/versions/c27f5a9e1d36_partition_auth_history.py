@@ -0,0 +1,107 @@
+"""Partition auth history by month
+
+Revision ID: c27f5a9e1d36
+Revises: 8d41e0c5b7a2
+Create Date: 2026-10-17 01:04:51.226870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27f5a9e1d36'
+down_revision: Union[str, Sequence[str], None] = '8d41e0c5b7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Сколько месяцев вперед создать сразу, дальше партиции создает
+# MonthlyPartitionManager при запуске приложения
+PREMAKE_MONTHS = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('ALTER TABLE auth_history RENAME TO auth_history_old')
+    op.execute(
+        'ALTER INDEX ix_auth_history_user_id_timestamp '
+        'RENAME TO ix_auth_history_old_user_id_timestamp'
+    )
+    op.execute(
+        'ALTER TABLE auth_history_old '
+        'RENAME CONSTRAINT auth_history_pkey TO auth_history_old_pkey'
+    )
+    op.execute(
+        'CREATE TABLE auth_history ('
+        ' id UUID NOT NULL,'
+        ' user_id UUID NOT NULL'
+        '  REFERENCES "user" (id) ON DELETE CASCADE,'
+        ' user_agent VARCHAR NOT NULL,'
+        ' timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,'
+        ' CONSTRAINT auth_history_pkey PRIMARY KEY (id, user_id, timestamp)'
+        ') PARTITION BY RANGE (timestamp)'
+    )
+    op.execute(
+        'CREATE INDEX ix_auth_history_user_id_timestamp '
+        'ON auth_history (user_id, timestamp)'
+    )
+    # Партиции на каждый месяц с существующими записями и на будущее
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month DATE;
+            last_month DATE := date_trunc('month', now())
+                + interval '{PREMAKE_MONTHS} months';
+        BEGIN
+            SELECT date_trunc('month', COALESCE(min(timestamp), now()))
+            INTO month FROM auth_history_old;
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF auth_history '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'auth_history_p' || to_char(month, 'YYYY_MM'),
+                    month, month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    op.execute(
+        'INSERT INTO auth_history (id, user_id, user_agent, timestamp) '
+        'SELECT id, user_id, user_agent, timestamp FROM auth_history_old'
+    )
+    op.execute('DROP TABLE auth_history_old')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE auth_history RENAME TO auth_history_partitioned')
+    op.execute(
+        'ALTER INDEX ix_auth_history_user_id_timestamp '
+        'RENAME TO ix_auth_history_partitioned_user_id_timestamp'
+    )
+    op.execute(
+        'ALTER TABLE auth_history_partitioned '
+        'RENAME CONSTRAINT auth_history_pkey TO auth_history_partitioned_pkey'
+    )
+    op.execute(
+        'CREATE TABLE auth_history ('
+        ' id UUID NOT NULL,'
+        ' user_id UUID NOT NULL'
+        '  REFERENCES "user" (id) ON DELETE CASCADE,'
+        ' user_agent VARCHAR NOT NULL,'
+        ' timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,'
+        ' CONSTRAINT auth_history_pkey PRIMARY KEY (id, user_id)'
+        ')'
+    )
+    op.execute(
+        'INSERT INTO auth_history (id, user_id, user_agent, timestamp) '
+        'SELECT id, user_id, user_agent, timestamp '
+        'FROM auth_history_partitioned'
+    )
+    op.execute(
+        'CREATE INDEX ix_auth_history_user_id_timestamp '
+        'ON auth_history (user_id, timestamp)'
+    )
+    op.execute('DROP TABLE auth_history_partitioned')
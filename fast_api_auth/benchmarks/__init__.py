@@ -0,0 +1,7 @@
+"""Нагрузочные и микро-бенчмарки сервиса авторизации.
+
+Сценарии HTTP выполняются против `src.main:app` через ASGI без сети:
+Redis заменяется fakeredis в процессе, Postgres запускается локально
+во временном каталоге (`python -m benchmarks.run`). Микро-бенчмарки
+горячих путей не требуют внешних сервисов (`python -m benchmarks.micro`).
+"""
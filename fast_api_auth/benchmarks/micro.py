@@ -0,0 +1,206 @@
+"""Микро-бенчмарки горячих путей без внешних сервисов.
+
+Пример:
+    python -m benchmarks.micro --save benchmarks/micro-baseline.json
+    python -m benchmarks.micro --compare benchmarks/micro-baseline.json
+
+Измеряется стоимость одного вызова в потоке event loop: проверка
+`jti` по фильтру отозванных токенов, запись лога через очередь и
+напрямую в поток, подпись и проверка JWT, отпечаток SQL.
+"""
+import argparse
+import io
+import logging
+import queue
+import sys
+import time
+import uuid
+from logging.handlers import QueueListener
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.stand import configure_environment
+from benchmarks.stats import (
+    Result,
+    compare,
+    print_results,
+    save_baseline,
+    summarize,
+)
+
+
+STATEMENT = (
+    'SELECT "user".id, "user".email, "user".is_active FROM "user" '
+    'JOIN user_role ON user_role.user_id = "user".id '
+    "WHERE \"user\".email = 'someone@example.com' AND user_role.role_id "
+    'IN ($1::UUID, $2::UUID, $3::UUID) ORDER BY "user".id LIMIT 50'
+)
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--iterations', type=int, default=100000,
+        help='вызовов на бенчмарк',
+    )
+    parser.add_argument(
+        '--save', type=Path, help='сохранить результаты в JSON'
+    )
+    parser.add_argument(
+        '--compare', type=Path, help='сравнить с сохраненным JSON'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='допустимое ухудшение метрик при сравнении (доля)',
+    )
+    return parser.parse_args()
+
+
+def measure(func: Callable[[int], None], iterations: int) -> Result:
+    """Вызывает `func(index)` и измеряет каждый вызов.
+
+    Первые 1% вызовов не учитываются, чтобы не мерить прогрев кешей.
+    """
+    for index in range(max(1, iterations // 100)):
+        func(index)
+    latencies = []
+    start = time.perf_counter()
+    for index in range(iterations):
+        call_start = time.perf_counter()
+        func(index)
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, 0, time.perf_counter() - start)
+
+
+def _logger(name: str, handler: logging.Handler) -> logging.Logger:
+    """Отдельный логгер с единственным обработчиком."""
+    logger = logging.getLogger(f'benchmarks.{name}')
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def logging_benchmarks(iterations: int) -> dict[str, Result]:
+    """Запись лога из потока приложения: через очередь и напрямую.
+
+    Очередь не ограничена, чтобы измерялась постановка записи, а не
+    отбрасывание при переполнении.
+    """
+    from src.core.logger import BoundedQueueHandler
+
+    formatter = logging.Formatter(
+        '%(asctime)s %(levelname)s %(name)s %(message)s'
+    )
+    stream = logging.StreamHandler(io.StringIO())
+    stream.setFormatter(formatter)
+    handler = BoundedQueueHandler(queue.Queue())
+    listener = QueueListener(handler.queue, stream)
+    queued = _logger('queued', handler)
+    direct_stream = logging.StreamHandler(io.StringIO())
+    direct_stream.setFormatter(formatter)
+    direct = _logger('direct', direct_stream)
+
+    listener.start()
+    try:
+        results = {
+            'log_queued': measure(
+                lambda index: queued.info('Запрос %s выполнен', index),
+                iterations,
+            ),
+        }
+    finally:
+        listener.stop()
+    results['log_direct'] = measure(
+        lambda index: direct.info('Запрос %s выполнен', index), iterations
+    )
+    return results
+
+
+def jwt_benchmarks(iterations: int) -> dict[str, Result]:
+    """Подпись и проверка access token активным ключом."""
+    from src.core.keys import key_ring
+
+    key_ring.load()
+    audience = ['fastapi-users:auth']
+    payload = {
+        'sub': str(uuid.uuid4()),
+        'aud': audience,
+        'jti': uuid.uuid4().hex,
+        'exp': int(time.time()) + 3600,
+        'roles': ['reader', 'writer'],
+    }
+    token = key_ring.encode(payload)
+    return {
+        'jwt_encode': measure(
+            lambda index: key_ring.encode(payload), iterations
+        ),
+        'jwt_decode': measure(
+            lambda index: key_ring.decode(token, audience), iterations
+        ),
+    }
+
+
+def revocation_benchmarks(iterations: int) -> dict[str, Result]:
+    """Проверка `jti` по загруженному фильтру текущей эпохи."""
+    from src.core.revocation import revocation_list
+
+    revocation_list._filters[revocation_list._epoch()] = bytearray(
+        revocation_list.bits // 8
+    )
+    for _ in range(1000):
+        revocation_list._add_local(uuid.uuid4().hex)
+    tokens = [uuid.uuid4().hex for _ in range(1024)]
+    return {
+        'revocation_check': measure(
+            lambda index: revocation_list.might_be_revoked(
+                tokens[index & 1023]
+            ),
+            iterations,
+        ),
+    }
+
+
+def fingerprint_benchmarks(iterations: int) -> dict[str, Result]:
+    """Отпечаток SQL: без кеша и повторный из кеша."""
+    from src.db.query_log import fingerprint
+
+    return {
+        'sql_fingerprint': measure(
+            lambda index: fingerprint.__wrapped__(STATEMENT), iterations
+        ),
+        'sql_fingerprint_cached': measure(
+            lambda index: fingerprint(STATEMENT), iterations
+        ),
+    }
+
+
+def main() -> int:
+    """Точка входа: возвращает 1, если найдены регрессии."""
+    args = parse_args()
+    configure_environment(None)
+    results = {}
+    for benchmarks in (
+            revocation_benchmarks,
+            jwt_benchmarks,
+            fingerprint_benchmarks,
+            logging_benchmarks,
+        ):
+        print(f'{benchmarks.__name__}...', file=sys.stderr)
+        results.update(benchmarks(args.iterations))
+
+    print_results(results)
+    params = {'iterations': args.iterations, 'benchmark': 'micro'}
+    if args.save is not None:
+        save_baseline(args.save, results, params)
+    if args.compare is not None:
+        regressions = compare(args.compare, results, args.threshold)
+        if regressions:
+            print('\nРегрессии:\n' + '\n'.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
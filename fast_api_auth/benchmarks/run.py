@@ -0,0 +1,209 @@
+"""Нагрузочные сценарии против `src.main:app` через ASGI.
+
+Пример:
+    python -m benchmarks.run --concurrency 32 --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+Postgres запускается во временном каталоге (`initdb`/`pg_ctl` из PATH,
+`--pg-bin` или BENCH_PG_BIN). С `--external-postgres` используются
+настройки POSTGRES_* из окружения; база должна быть пустой.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.scenarios import SCENARIOS, Scenario, Worker
+from benchmarks.stand import (
+    LocalPostgres,
+    configure_environment,
+    create_schema,
+    install_fake_redis,
+)
+from benchmarks.stats import (
+    Result,
+    compare,
+    print_results,
+    save_baseline,
+    summarize,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--requests', type=int, default=1000,
+        help='операций на сценарий',
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=16,
+        help='одновременных клиентов',
+    )
+    parser.add_argument(
+        '--scenario', action='append', choices=list(SCENARIOS),
+        help='сценарий для запуска, можно указать несколько раз',
+    )
+    parser.add_argument(
+        '--save', type=Path, help='сохранить результаты в JSON'
+    )
+    parser.add_argument(
+        '--compare', type=Path, help='сравнить с сохраненным JSON'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='допустимое ухудшение метрик при сравнении (доля)',
+    )
+    parser.add_argument(
+        '--pg-bin', default=os.environ.get('BENCH_PG_BIN'),
+        help='каталог с initdb и pg_ctl',
+    )
+    parser.add_argument(
+        '--external-postgres', action='store_true',
+        help='использовать Postgres из переменных POSTGRES_*',
+    )
+    return parser.parse_args()
+
+
+def _split(total: int, parts: int) -> list[int]:
+    """Делит операции между клиентами."""
+    base, extra = divmod(total, parts)
+    return [base + (index < extra) for index in range(parts)]
+
+
+async def _workers(
+        transport: httpx.ASGITransport,
+        scenario: Scenario,
+        counts: list[int],
+    ) -> list[Worker]:
+    """Создает и готовит клиентов сценария."""
+    workers = [
+        Worker(httpx.AsyncClient(transport=transport, base_url='http://bench'))
+        for _ in counts
+    ]
+    await asyncio.gather(*(
+        scenario.prepare(worker, count)
+        for worker, count in zip(workers, counts)
+    ))
+    return workers
+
+
+async def run_scenario(
+        transport: httpx.ASGITransport,
+        scenario: Scenario,
+        requests: int,
+        concurrency: int,
+    ) -> Result:
+    """Выполняет сценарий и измеряет задержку каждой операции.
+
+    Если у сценария задан `background`, его клиенты нагружают приложение
+    в том же количестве, пока выполняются измеряемые операции.
+    """
+    counts = _split(requests, concurrency)
+    workers = await _workers(transport, scenario, counts)
+    background_workers = []
+    background_tasks = []
+    if scenario.background is not None:
+        background = SCENARIOS[scenario.background]
+        background_workers = await _workers(
+            transport, background, [0] * concurrency
+        )
+        background_tasks = [
+            asyncio.create_task(_load(background, worker))
+            for worker in background_workers
+        ]
+
+    latencies: list[float] = []
+    errors = 0
+
+    async def measure(worker: Worker, count: int) -> None:
+        nonlocal errors
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                response = await scenario.request(worker)
+                failed = response.status_code not in scenario.expected
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        measure(worker, count) for worker, count in zip(workers, counts)
+    ))
+    elapsed = time.perf_counter() - start
+
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    for worker in workers + background_workers:
+        await worker.client.aclose()
+    return summarize(latencies, errors, elapsed)
+
+
+async def _load(scenario: Scenario, worker: Worker) -> None:
+    """Выполняет операции сценария до отмены задачи.
+
+    Ответ из кеша может не освобождать event loop, поэтому после каждой
+    операции управление явно передается измеряемым клиентам.
+    """
+    while True:
+        await scenario.request(worker)
+        await asyncio.sleep(0)
+
+
+async def run(args: argparse.Namespace) -> dict[str, Result]:
+    """Поднимает приложение и выполняет выбранные сценарии."""
+    install_fake_redis()
+    await create_schema()
+
+    from src.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with app.router.lifespan_context(app):
+        for name in args.scenario or SCENARIOS:
+            print(f'{name}...', file=sys.stderr)
+            results[name] = await run_scenario(
+                transport, SCENARIOS[name], args.requests, args.concurrency
+            )
+    return results
+
+
+def main() -> int:
+    """Точка входа: возвращает 1, если найдены регрессии."""
+    args = parse_args()
+    postgres = None
+    if not args.external_postgres:
+        postgres = LocalPostgres(args.pg_bin)
+        postgres.start()
+    try:
+        configure_environment(postgres and postgres.environment())
+        results = asyncio.run(run(args))
+    finally:
+        if postgres is not None:
+            postgres.stop()
+
+    print_results(results)
+    params = {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'benchmark': 'http',
+    }
+    if args.save is not None:
+        save_baseline(args.save, results, params)
+    if args.compare is not None:
+        regressions = compare(args.compare, results, args.threshold)
+        if regressions:
+            print('\nРегрессии:\n' + '\n'.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
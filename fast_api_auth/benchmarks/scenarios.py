@@ -0,0 +1,291 @@
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+import httpx
+
+from benchmarks.stand import SUPERUSER_EMAIL, SUPERUSER_PASSWORD
+
+
+API = '/auth/v1'
+PASSWORD = 'bench-user-password'
+
+
+@dataclass(slots=True)
+class Worker:
+    """Состояние одного конкурентного клиента.
+
+    Attributes:
+        client: HTTP-клиент поверх ASGI-транспорта приложения
+        email: Пользователь, под которым работает клиент
+        access_token: Текущий access token
+        refresh_token: Текущий refresh token из cookie
+        items: Подготовленные идентификаторы (роли для изменения/удаления)
+        etag: ETag первой страницы ролей
+
+    """
+
+    client: httpx.AsyncClient
+    email: str | None = None
+    access_token: str | None = None
+    refresh_token: str | None = None
+    items: list[str] = field(default_factory=list)
+    etag: str | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Заголовок авторизации текущего пользователя."""
+        return {'Authorization': f'Bearer {self.access_token}'}
+
+
+def _unique_email() -> str:
+    """Адрес нового пользователя для сценариев."""
+    return f'user-{uuid.uuid4().hex}@bench.example.com'
+
+
+async def register(worker: Worker, email: str) -> httpx.Response:
+    """Регистрирует пользователя."""
+    return await worker.client.post(
+        f'{API}/register', json={'email': email, 'password': PASSWORD}
+    )
+
+
+async def login(worker: Worker, email: str, password: str) -> httpx.Response:
+    """Выполняет вход и запоминает выданные токены."""
+    response = await worker.client.post(
+        f'{API}/jwt/login', data={'username': email, 'password': password}
+    )
+    if response.status_code == 200:
+        worker.access_token = response.json()['access_token']
+        worker.refresh_token = response.cookies.get('refresh_token')
+    return response
+
+
+def _expect(response: httpx.Response, *codes: int) -> None:
+    """Прерывает подготовку, если приложение ответило неожиданно."""
+    if response.status_code not in codes:
+        raise RuntimeError(
+            f'{response.request.method} {response.request.url.path}: '
+            f'{response.status_code} {response.text[:200]}'
+        )
+
+
+class Scenario(ABC):
+    """Сценарий нагрузки: подготовка клиента и одна измеряемая операция.
+
+    Attributes:
+        name: Имя сценария в отчете и в базовом JSON
+        expected: Коды ответа, которые не считаются ошибкой
+        background: Сценарий, нагружающий приложение параллельно
+            с измеряемым, или None
+
+    """
+
+    name: str
+    expected: tuple[int, ...] = (200,)
+    background: str | None = None
+
+    async def prepare(self, worker: Worker, count: int) -> None:
+        """Готовит клиента к выполнению `count` операций."""
+
+    @abstractmethod
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Выполняет одну измеряемую операцию."""
+
+
+class UserScenario(Scenario):
+    """Базовый сценарий от имени зарегистрированного пользователя."""
+
+    async def prepare(self, worker: Worker, count: int) -> None:
+        """Регистрирует пользователя клиента и входит под ним."""
+        worker.email = _unique_email()
+        _expect(await register(worker, worker.email), 201)
+        _expect(await login(worker, worker.email, PASSWORD), 200)
+
+
+class SuperuserScenario(Scenario):
+    """Базовый сценарий от имени суперпользователя."""
+
+    async def prepare(self, worker: Worker, count: int) -> None:
+        """Входит под первым суперпользователем."""
+        worker.email = SUPERUSER_EMAIL
+        _expect(
+            await login(worker, SUPERUSER_EMAIL, SUPERUSER_PASSWORD), 200
+        )
+
+    async def create_role(self, worker: Worker) -> httpx.Response:
+        """Создает роль с уникальным именем."""
+        return await worker.client.post(
+            f'{API}/roles/',
+            json={
+                'name': f'bench-{uuid.uuid4().hex}',
+                'permissions': ['read'],
+            },
+            headers=worker.headers,
+        )
+
+
+class Register(Scenario):
+    """Регистрация нового пользователя, включая хеширование пароля."""
+
+    name = 'register'
+    expected = (201,)
+
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Регистрирует пользователя с новым адресом."""
+        return await register(worker, _unique_email())
+
+
+class Login(UserScenario):
+    """Вход по паролю: проверка хеша, выпуск токенов, запись истории."""
+
+    name = 'login'
+
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Входит под пользователем клиента."""
+        return await login(worker, worker.email, PASSWORD)
+
+
+class Refresh(UserScenario):
+    """Обновление access token с ротацией refresh token."""
+
+    name = 'refresh'
+
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Обменивает текущий refresh token на следующий."""
+        response = await worker.client.post(
+            f'{API}/refresh',
+            headers={
+                **worker.headers,
+                'Cookie': f'refresh_token={worker.refresh_token}',
+            },
+        )
+        if response.status_code == 200:
+            worker.access_token = response.json()['access_token']
+            worker.refresh_token = response.cookies.get('refresh_token')
+        return response
+
+
+class RefreshUnderLogin(Refresh):
+    """Обновление токенов, пока остальные клиенты выполняют вход.
+
+    Вход занимает пул хеширования паролей, поэтому сценарий показывает,
+    не ждет ли обновление токена за тяжелыми операциями.
+    """
+
+    name = 'refresh_under_login'
+    background = 'login'
+
+
+class UsersMe(UserScenario):
+    """Профиль текущего пользователя по access token."""
+
+    name = 'users_me'
+
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Запрашивает профиль."""
+        return await worker.client.get(
+            f'{API}/users/me', headers=worker.headers
+        )
+
+
+class RoleCreate(SuperuserScenario):
+    """Создание роли."""
+
+    name = 'role_create'
+
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Создает роль."""
+        return await self.create_role(worker)
+
+
+class RoleUpdate(SuperuserScenario):
+    """Изменение роли: каждый клиент изменяет свою роль."""
+
+    name = 'role_update'
+
+    async def prepare(self, worker: Worker, count: int) -> None:
+        """Создает роль клиента."""
+        await super().prepare(worker, count)
+        response = await self.create_role(worker)
+        _expect(response, 200)
+        worker.items.append(response.json()['id'])
+
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Переименовывает роль клиента."""
+        return await worker.client.patch(
+            f'{API}/roles/{worker.items[0]}',
+            json={'name': f'bench-{uuid.uuid4().hex}'},
+            headers=worker.headers,
+        )
+
+
+class RoleDelete(SuperuserScenario):
+    """Удаление роли."""
+
+    name = 'role_delete'
+
+    async def prepare(self, worker: Worker, count: int) -> None:
+        """Создает по роли на каждую операцию клиента."""
+        await super().prepare(worker, count)
+        for _ in range(count):
+            response = await self.create_role(worker)
+            _expect(response, 200)
+            worker.items.append(response.json()['id'])
+
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Удаляет следующую подготовленную роль."""
+        return await worker.client.delete(
+            f'{API}/roles/{worker.items.pop()}', headers=worker.headers
+        )
+
+
+class RolesList(SuperuserScenario):
+    """Первая страница списка ролей."""
+
+    name = 'roles_list'
+
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Запрашивает первую страницу ролей."""
+        return await worker.client.get(
+            f'{API}/roles/all', headers=worker.headers
+        )
+
+
+class RolesListCached(RolesList):
+    """Первая страница ролей с совпадающим `If-None-Match`."""
+
+    name = 'roles_list_cached'
+    expected = (304,)
+
+    async def prepare(self, worker: Worker, count: int) -> None:
+        """Запоминает ETag первой страницы."""
+        await super().prepare(worker, count)
+        response = await super().request(worker)
+        _expect(response, 200)
+        worker.etag = response.headers['ETag']
+
+    async def request(self, worker: Worker) -> httpx.Response:
+        """Запрашивает страницу с ETag из подготовки."""
+        return await worker.client.get(
+            f'{API}/roles/all',
+            headers={**worker.headers, 'If-None-Match': worker.etag},
+        )
+
+
+"""Сценарии по имени в порядке выполнения."""
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Register(),
+        Login(),
+        Refresh(),
+        UsersMe(),
+        RoleCreate(),
+        RoleUpdate(),
+        RoleDelete(),
+        RolesList(),
+        RolesListCached(),
+        RefreshUnderLogin(),
+    )
+}
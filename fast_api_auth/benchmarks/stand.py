@@ -0,0 +1,189 @@
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from pathlib import Path
+
+import fakeredis
+from fakeredis.aioredis import FakeConnection
+from redis import asyncio as aioredis
+
+
+BENCH_USER = 'bench'
+BENCH_PASSWORD = 'bench'
+BENCH_DB = 'postgres'
+SUPERUSER_EMAIL = 'admin@bench.example.com'
+SUPERUSER_PASSWORD = 'bench-admin-password'
+
+
+def _free_port() -> int:
+    """Свободный TCP-порт на loopback."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class LocalPostgres:
+    """Временный кластер Postgres, доступный только на 127.0.0.1.
+
+    Кластер создается `initdb` во временном каталоге и удаляется при
+    остановке. fsync и synchronous_commit отключены: сравниваются
+    запуски между коммитами, а не абсолютная скорость диска.
+
+    Attributes:
+        bin_dir: Каталог с initdb и pg_ctl, по умолчанию из PATH
+        port: Порт запущенного сервера
+
+    """
+
+    def __init__(self, bin_dir: str | None = None) -> None:
+        self.bin_dir = bin_dir
+        self.port = _free_port()
+        self._root: Path | None = None
+
+    def _binary(self, name: str) -> str:
+        """Путь к утилите Postgres."""
+        if self.bin_dir is not None:
+            return str(Path(self.bin_dir) / name)
+        path = shutil.which(name)
+        if path is None:
+            raise RuntimeError(
+                f'{name} не найден: установите Postgres или передайте '
+                '--pg-bin / BENCH_PG_BIN'
+            )
+        return path
+
+    def start(self) -> None:
+        """Создает кластер и запускает сервер."""
+        self._root = Path(tempfile.mkdtemp(prefix='auth-bench-pg-'))
+        data = self._root / 'data'
+        password_file = self._root / 'password'
+        password_file.write_text(BENCH_PASSWORD)
+        subprocess.run(
+            [
+                self._binary('initdb'), '-D', str(data), '-U', BENCH_USER,
+                f'--pwfile={password_file}', '--auth=md5', '-E', 'UTF8',
+            ],
+            check=True, capture_output=True,
+        )
+        options = ' '.join((
+            '-c listen_addresses=127.0.0.1',
+            f'-p {self.port}',
+            f'-k {self._root}',
+            '-c fsync=off',
+            '-c synchronous_commit=off',
+            '-c full_page_writes=off',
+            '-c max_connections=200',
+        ))
+        subprocess.run(
+            [
+                self._binary('pg_ctl'), '-D', str(data), '-o', options,
+                '-l', str(self._root / 'server.log'), '-w', 'start',
+            ],
+            check=True, capture_output=True,
+        )
+
+    def stop(self) -> None:
+        """Останавливает сервер и удаляет кластер."""
+        if self._root is None:
+            return
+        subprocess.run(
+            [
+                self._binary('pg_ctl'), '-D', str(self._root / 'data'),
+                '-m', 'fast', '-w', 'stop',
+            ],
+            check=False, capture_output=True,
+        )
+        shutil.rmtree(self._root, ignore_errors=True)
+        self._root = None
+
+    def environment(self) -> dict[str, str]:
+        """Переменные окружения настроек Postgres приложения."""
+        return {
+            'POSTGRES_HOST': '127.0.0.1',
+            'POSTGRES_PORT': str(self.port),
+            'POSTGRES_USER': BENCH_USER,
+            'POSTGRES_PASSWORD': BENCH_PASSWORD,
+            'POSTGRES_DB_NAME': BENCH_DB,
+        }
+
+
+def configure_environment(postgres: dict[str, str] | None) -> None:
+    """Задает настройки приложения до импорта `src`.
+
+    Лимиты попыток входа поднимаются, чтобы сценарий входа не упирался
+    в 429, а журнал запросов и профилирование остаются как в продакшене.
+
+    Args:
+        postgres: Настройки Postgres или None, чтобы взять их из окружения
+
+    """
+    defaults = {
+        'PROJECT_AUTH_NAME': 'auth-bench',
+        'PROJECT_AUTH_SUMMARY': 'benchmark',
+        'SECRET': 'benchmark-secret',
+        'FIRST_SUPERUSER_EMAIL': SUPERUSER_EMAIL,
+        'FIRST_SUPERUSER_PASSWORD': SUPERUSER_PASSWORD,
+        'REDIS_HOST': 'fakeredis',
+        'REDIS_PORT': '6379',
+        'REDIS_USER': 'bench',
+        'REDIS_PASSWORD': 'bench',
+        'REDIS_DB_INDEX': '0',
+        'POSTGRES_HOST': '127.0.0.1',
+        'POSTGRES_PORT': '5432',
+        'POSTGRES_USER': BENCH_USER,
+        'POSTGRES_PASSWORD': BENCH_PASSWORD,
+        'POSTGRES_DB_NAME': BENCH_DB,
+        'LOG_LEVEL': 'WARNING',
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+    for name in ('LOGIN_IP_BURST', 'LOGIN_EMAIL_BURST'):
+        os.environ[name] = '1000000000'
+    for name in ('LOGIN_IP_PER_MINUTE', 'LOGIN_EMAIL_PER_MINUTE'):
+        os.environ[name] = '1000000000'
+    os.environ.update(postgres or {})
+
+
+def install_fake_redis() -> fakeredis.FakeServer:
+    """Подменяет подключение к Redis на fakeredis в том же процессе.
+
+    Клиент остается `BreakerRedis`, поэтому предохранитель и метрики
+    команд работают как с настоящим Redis. Lua-скрипты выполняются
+    через lupa.
+
+    Returns:
+        FakeServer: Общий сервер для всех клиентов приложения
+
+    """
+    from src.core.config import RedisSettings
+    from src.db import redis_cache
+    from src.utils.circuit_breaker import CircuitBreaker
+
+    server = fakeredis.FakeServer()
+
+    def create(
+            settings: RedisSettings,
+            breaker: CircuitBreaker | None = None,
+        ) -> aioredis.Redis:
+        pool = aioredis.ConnectionPool(
+            connection_class=FakeConnection,
+            server=server,
+            max_connections=settings.max_connections,
+        )
+        client = redis_cache.BreakerRedis.from_pool(pool)
+        client.breaker = breaker
+        return client
+
+    redis_cache.RedisClientFactory.create = staticmethod(create)
+    return server
+
+
+async def create_schema() -> None:
+    """Создает таблицы по моделям на пустой базе."""
+    from src.core.base import Base
+    from src.db.postgres import engine
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
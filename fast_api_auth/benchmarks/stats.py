@@ -0,0 +1,142 @@
+import math
+import platform
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import orjson
+
+
+@dataclass(frozen=True, slots=True)
+class Result:
+    """Итог одного сценария.
+
+    Attributes:
+        requests: Количество выполненных операций
+        errors: Количество операций с ошибкой
+        throughput: Операций в секунду
+        p50_ms: Медиана задержки в миллисекундах
+        p95_ms: 95-й перцентиль задержки
+        p99_ms: 99-й перцентиль задержки
+        max_ms: Максимальная задержка
+
+    """
+
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> Result:
+    """Считает пропускную способность и перцентили задержек в секундах."""
+    values = sorted(latencies)
+    return Result(
+        requests=len(values),
+        errors=errors,
+        throughput=len(values) / elapsed if elapsed > 0 else 0.0,
+        p50_ms=percentile(values, 0.50) * 1000,
+        p95_ms=percentile(values, 0.95) * 1000,
+        p99_ms=percentile(values, 0.99) * 1000,
+        max_ms=(values[-1] if values else 0.0) * 1000,
+    )
+
+
+def print_results(results: dict[str, Result]) -> None:
+    """Печатает результаты таблицей."""
+    header = (
+        f'{"scenario":<28}{"ops":>8}{"err":>6}{"ops/s":>11}'
+        f'{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}'
+    )
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        print(
+            f'{name:<28}{result.requests:>8}{result.errors:>6}'
+            f'{result.throughput:>11.1f}{result.p50_ms:>10.4f}'
+            f'{result.p95_ms:>10.4f}{result.p99_ms:>10.4f}'
+        )
+
+
+def _git_commit() -> str | None:
+    """Текущий коммит репозитория, если он доступен."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_baseline(
+        path: Path, results: dict[str, Result], params: dict[str, any]
+    ) -> None:
+    """Сохраняет результаты в JSON для сравнения с будущими запусками."""
+    data = {
+        'commit': _git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'params': params,
+        'results': {name: asdict(result) for name, result in results.items()},
+    }
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
+def compare(
+        path: Path, results: dict[str, Result], threshold: float
+    ) -> list[str]:
+    """Сравнивает результаты с сохраненными.
+
+    Регрессией считается рост p95/p99 или падение пропускной способности
+    больше чем на `threshold` (доля).
+
+    Returns:
+        list: Описания регрессий, пустой список если их нет
+
+    """
+    baseline = orjson.loads(path.read_bytes())
+    print(f'\nСравнение с {path} (коммит {baseline.get("commit")}):')
+    regressions = []
+    for name, result in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f'{name:<28} нет в базовом запуске')
+            continue
+        changes = {
+            'ops/s': _change(previous['throughput'], result.throughput),
+            'p95': _change(previous['p95_ms'], result.p95_ms),
+            'p99': _change(previous['p99_ms'], result.p99_ms),
+        }
+        print(f'{name:<28}' + ''.join(
+            f'{metric:>8} {change:+7.1%}'
+            for metric, change in changes.items()
+        ))
+        if changes['ops/s'] < -threshold:
+            regressions.append(
+                f'{name}: пропускная способность {changes["ops/s"]:+.1%}'
+            )
+        for metric in ('p95', 'p99'):
+            if changes[metric] > threshold:
+                regressions.append(f'{name}: {metric} {changes[metric]:+.1%}')
+    return regressions
+
+
+def _change(previous: float, current: float) -> float:
+    """Относительное изменение значения."""
+    if previous == 0:
+        return 0.0
+    return (current - previous) / previous
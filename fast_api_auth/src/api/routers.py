@@ -1,6 +1,14 @@
 from fastapi import APIRouter
 
-from src.api.v1 import role_router, user_router
+from src.api.v1 import (
+    admin_router,
+    health_router,
+    history_router,
+    jwks_router,
+    metrics_router,
+    role_router,
+    user_router,
+)
 
 
 API_V1: str = '/auth/v1'
@@ -9,3 +17,14 @@ main_router.include_router(user_router, prefix=f'{API_V1}')
 main_router.include_router(
     role_router, prefix=f'{API_V1}/roles', tags=['roles']
 )
+main_router.include_router(
+    history_router, prefix=f'{API_V1}/history', tags=['users']
+)
+main_router.include_router(
+    admin_router, prefix=f'{API_V1}/admin', tags=['auth']
+)
+main_router.include_router(
+    health_router, prefix=f'{API_V1}', tags=['auth']
+)
+main_router.include_router(jwks_router, tags=['auth'])
+main_router.include_router(metrics_router, prefix='/auth', tags=['auth'])
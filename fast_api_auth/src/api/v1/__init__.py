@@ -1,8 +1,18 @@
+from .admin_api import router as admin_router
+from .health_api import router as health_router
+from .history_api import router as history_router
+from .jwks_api import router as jwks_router
+from .metrics_api import router as metrics_router
 from .role_api import router as role_router
 from .user_api import router as user_router
 
 
 __all__ = [
+    admin_router,
+    health_router,
+    history_router,
+    jwks_router,
+    metrics_router,
     role_router,
     user_router
 ]
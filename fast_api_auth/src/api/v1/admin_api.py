@@ -0,0 +1,56 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+
+from src.core.principal import Principal, current_superprincipal
+from src.db.query_log import query_log
+from src.schemas.query_schema import QuerySort, QueryStatistic
+
+
+router = APIRouter()
+
+
+@router.get(
+    '/queries',
+    summary='SQL statement statistics',
+    description=(
+        'Aggregated SQL statements of this worker grouped by fingerprint, '
+        'heaviest first. Superuser only.'
+    ),
+    response_model=list[QueryStatistic],
+)
+async def get_query_statistics(
+    limit: Annotated[int, Query(ge=1, le=1000)] = 50,
+    sort: QuerySort = QuerySort.total,
+    principal: Principal = Depends(current_superprincipal),
+) -> list[dict[str, any]]:
+    """Самые тяжелые SQL-запросы воркера по отпечаткам.
+
+    Args:
+        limit: Количество отпечатков
+        sort: Поле сортировки
+        principal: Текущий суперпользователь
+
+    Returns:
+        list: Статистика отпечатков
+
+    """
+    return query_log.top(limit, sort.value)
+
+
+@router.delete(
+    '/queries',
+    summary='Reset SQL statement statistics',
+    description='Clears the statement statistics of this worker.',
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def reset_query_statistics(
+    principal: Principal = Depends(current_superprincipal),
+) -> None:
+    """Сбрасывает статистику SQL-запросов воркера.
+
+    Args:
+        principal: Текущий суперпользователь
+
+    """
+    query_log.reset()
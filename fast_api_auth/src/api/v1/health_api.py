@@ -0,0 +1,36 @@
+from fastapi import APIRouter, status
+from fastapi.responses import ORJSONResponse
+
+from src.utils.circuit_breaker import BreakerState, breakers
+
+
+router = APIRouter()
+
+
+@router.get(
+    '/health',
+    summary='Service health',
+    description='Circuit breaker state of Redis and Postgres',
+)
+async def get_health() -> ORJSONResponse:
+    """Состояние предохранителей внешних зависимостей.
+
+    Обращений к Redis и Postgres нет: ответ строится по состоянию
+    предохранителей, поэтому эндпоинт можно часто опрашивать
+    балансировщиком.
+
+    Returns:
+        ORJSONResponse: 200, если все зависимости доступны, иначе 503
+
+    """
+    stats = {name: breaker.stats() for name, breaker in breakers.items()}
+    degraded = any(
+        breaker.state is BreakerState.OPEN for breaker in breakers.values()
+    )
+    return ORJSONResponse(
+        {'status': 'degraded' if degraded else 'ok', 'breakers': stats},
+        status_code=(
+            status.HTTP_503_SERVICE_UNAVAILABLE if degraded
+            else status.HTTP_200_OK
+        ),
+    )
@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from src.core.principal import Principal, current_superprincipal
+from src.schemas.auth_shema import ExportFormat
+from src.services.auth_history_service import (
+    AuthHistoryService,
+    get_auth_history_service,
+)
+
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: 'application/x-ndjson',
+    ExportFormat.csv: 'text/csv',
+}
+
+
+def _database_time(value: datetime | None) -> datetime | None:
+    """Приводит время с часовым поясом к naive времени сервера.
+
+    Колонка `timestamp` хранит naive время, записанное `datetime.now()`,
+    а asyncpg не сравнивает ее со значением с часовым поясом.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+@router.get(
+    '/export',
+    summary='Export authentication history',
+    description=(
+        'Stream authentication history ordered by time as NDJSON or CSV. '
+        'Filter by user and by the [since, until) period. Superuser only.'
+    ),
+    response_class=StreamingResponse,
+)
+async def export_auth_history(
+    export_format: Annotated[
+        ExportFormat, Query(alias='format')
+    ] = ExportFormat.ndjson,
+    user_id: UUID | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    history_service: AuthHistoryService = Depends(get_auth_history_service),
+    principal: Principal = Depends(current_superprincipal),
+) -> StreamingResponse:
+    """Потоковая выгрузка истории входов.
+
+    Args:
+        export_format: Формат выгрузки
+        user_id: Пользователь, без него выгружается вся история
+        since: Начало периода включительно
+        until: Конец периода не включительно
+        history_service: Сервис истории входов
+        principal: Текущий суперпользователь
+
+    Returns:
+        StreamingResponse: Выгрузка, отдаваемая порциями
+
+    """
+    try:
+        chunks = await history_service.export(
+            export_format,
+            user_id,
+            _database_time(since),
+            _database_time(until),
+        )
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error)
+        )
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename="auth_history.{export_format.value}"'
+            ),
+        },
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Response
+
+from src.core.config import project_settings
+from src.core.keys import key_ring
+
+
+router = APIRouter()
+
+
+@router.get(
+    '/.well-known/jwks.json',
+    summary='JSON Web Key Set',
+    description='Public keys for verifying access tokens',
+)
+async def get_jwks() -> Response:
+    """Публикация открытых ключей подписи токенов.
+
+    Сервисы проверяют access token локально по ключу из заголовка `kid`.
+    Набор собирается один раз при загрузке ключей и кешируется клиентами
+    на `jwks_max_age_seconds`.
+
+    Returns:
+        Response: JWKS в формате JSON
+
+    """
+    return Response(
+        content=key_ring.jwks,
+        media_type='application/json',
+        headers={
+            'Cache-Control': (
+                f'public, max-age={project_settings.jwks_max_age_seconds}'
+            ),
+        },
+    )
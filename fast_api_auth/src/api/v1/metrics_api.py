@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Response
+
+from src.services.metrics_service import metrics_service
+
+
+router = APIRouter()
+
+
+@router.get(
+    '/metrics',
+    summary='Prometheus metrics',
+    description='Metrics in the Prometheus text exposition format',
+)
+async def get_metrics() -> Response:
+    """Метрики сервиса для Prometheus.
+
+    При запуске с `PROMETHEUS_MULTIPROC_DIR` значения суммируются по
+    всем воркерам, поэтому любой воркер отдает одинаковую картину.
+
+    Returns:
+        Response: Метрики в текстовом формате
+
+    """
+    content, media_type = metrics_service.render()
+    return Response(content=content, media_type=media_type)
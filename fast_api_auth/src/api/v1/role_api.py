@@ -1,12 +1,22 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Query, Request, Response, status
 
-from src.core.user_core import current_superuser, current_user
+from src.core.config import project_settings
+from src.core.principal import Principal
+from src.core.user_core import current_superuser
+from src.dependencies.role_verification import role_verification
+from src.models.role import Permissions
 from src.models.user import User
 from src.schemas.response_schema import ResponseSchema
-from src.schemas.role_schema import RoleCreate, RoleGetFull, RoleUpdate
+from src.schemas.role_schema import (
+    RoleAssignment,
+    RoleAssignmentResult,
+    RoleCreate,
+    RoleGetFull,
+    RoleUpdate,
+)
 from src.services.role_service import RoleService, get_role_service
 
 
@@ -17,22 +27,49 @@ router = APIRouter()
         '/all',
         response_model=list[RoleGetFull],
         summary='Get all roles',
-        description='Get all roles'
+        description=(
+            'Get roles one page at a time. The next page '
+            'cursor is returned in the X-Next-Cursor header. Supports '
+            'If-None-Match. Requires the read permission.'
+        ),
     )
 async def get_all_roles(
+    request: Request,
+    limit: Annotated[
+        int, Query(ge=1, le=project_settings.roles_page_max_size)
+    ] = project_settings.roles_page_size,
+    cursor: Annotated[
+        str | None,
+        Query(description='X-Next-Cursor value from the previous page'),
+    ] = None,
     role_service: RoleService = Depends(get_role_service),
-    user: User = Depends(current_user)
-) -> list[RoleGetFull]:
-    """Получение списка всех ролей в системе.
+    principal: Principal = Depends(role_verification(Permissions.read))
+) -> Response:
+    """Получение списка ролей в системе постранично.
 
     Args:
+        request: Запрос, из которого читается `If-None-Match`
+        limit: Размер страницы
+        cursor: Курсор страницы из заголовка `X-Next-Cursor`
         role_service: Сервис для работы с ролями
-        user: Текущий аутентифицированный пользователь
+        principal: Пользователь с разрешением `read` из claims токена
     Returns:
-        list[RoleGetFull]: Список всех ролей с полной информацией
+        Response: JSON-массив ролей или 304, если ETag совпал
+
+    Raises:
+        HTTPException: 403 если у пользователя нет разрешения `read`
 
     """
-    return await role_service.get_all()
+    page = await role_service.get_page(limit, cursor)
+    headers = {'ETag': page.etag, 'Cache-Control': 'private, no-cache'}
+    if page.next_cursor is not None:
+        headers['X-Next-Cursor'] = page.next_cursor
+    if_none_match = request.headers.get('If-None-Match', '')
+    if page.etag in (tag.strip() for tag in if_none_match.split(',')):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    return Response(page.body, media_type='application/json', headers=headers)
 
 
 @router.post(
@@ -62,6 +99,67 @@ async def create_role(
     return await role_service.create(role_data)
 
 
+@router.post(
+    '/assign',
+    response_model=RoleAssignmentResult,
+    summary='Assign roles to users',
+    description=(
+        'Assign every given role to every given user in one statement. '
+        'Unknown ids and existing assignments are skipped.'
+    ),
+)
+async def assign_roles(
+    data: RoleAssignment,
+    role_service: RoleService = Depends(get_role_service),
+    user: User = Depends(current_superuser),
+) -> RoleAssignmentResult:
+    """Массовое назначение ролей пользователям.
+
+    Args:
+        data: Пользователи и назначаемые им роли
+        role_service: Сервис для работы с ролями
+        user: Текущий суперпользователь
+
+    Returns:
+        RoleAssignmentResult: Число запрошенных и созданных связей
+
+    Note:
+        Требует прав суперпользователя. Уже выданные access token
+        получат новые права после обновления
+
+    """
+    return await role_service.assign(data)
+
+
+@router.post(
+    '/unassign',
+    response_model=RoleAssignmentResult,
+    summary='Unassign roles from users',
+    description='Remove every given role from every given user at once.',
+)
+async def unassign_roles(
+    data: RoleAssignment,
+    role_service: RoleService = Depends(get_role_service),
+    user: User = Depends(current_superuser),
+) -> RoleAssignmentResult:
+    """Массовое снятие ролей с пользователей.
+
+    Args:
+        data: Пользователи и снимаемые с них роли
+        role_service: Сервис для работы с ролями
+        user: Текущий суперпользователь
+
+    Returns:
+        RoleAssignmentResult: Число запрошенных и удаленных связей
+
+    Note:
+        Требует прав суперпользователя. Уже выданные access token
+        теряют права после обновления
+
+    """
+    return await role_service.unassign(data)
+
+
 @router.patch(
     '/{role_id}',
     response_model=RoleGetFull,
@@ -1,6 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
 
-from src.core.config import project_settings
+from src.core.metrics import REFRESHES
+from src.core.principal import Principal, current_superprincipal
 from src.core.user_core import (
     UserManager,
     auth_backend,
@@ -9,15 +17,24 @@ from src.core.user_core import (
     get_user_manager,
     refresh_auth_backend,
 )
-from src.db.redis_cache import RedisClientFactory
 from src.models.user import User
+from src.schemas.token_schema import (
+    TokenIntrospectRequest,
+    TokenIntrospectResponse,
+)
 from src.schemas.user_schema import UserCreate, UserRead, UserUpdate
+from src.services.rate_limit_service import limit_login_attempts
+from src.services.token_service import TokenService, get_token_service
 
 
 router = APIRouter()
 
+auth_router = fastapi_users.get_auth_router(auth_backend)
+for route in auth_router.routes:
+    if route.name == f'auth:{auth_backend.name}.login':
+        route.dependencies.append(Depends(limit_login_attempts))
 router.include_router(
-    fastapi_users.get_auth_router(auth_backend),
+    auth_router,
     prefix='/jwt',
     tags=['auth'],
 )
@@ -48,13 +65,16 @@ router.include_router(
 )
 async def refresh_access_token(
     request: Request,
+    response: Response,
     user_manager: UserManager = Depends(get_user_manager),
+    token_service: TokenService = Depends(get_token_service),
     user: User = Depends(current_user)
 ) -> dict[str, str]:
     """Обновление access token с использованием refresh token из cookies.
 
-    Проверяет валидность refresh token из cookies против хранилища Redis
-    и выдает новый access token при успешной проверке.
+    Refresh token ротируется: в cookies записывается следующий токен того
+    же семейства, а предъявленный становится недействительным. Повторное
+    предъявление старого токена отзывает все семейство.
 
     Возвращает:
         dict: Новый access token в формате {'access_token': 'значение_токена'}
@@ -62,26 +82,57 @@ async def refresh_access_token(
     Исключения:
         HTTPException: 401 если refresh token недействителен или отсутствует
     """
-    refresh_token = request.cookies.get('refresh_token')
-    redis = await RedisClientFactory.create(project_settings.redis_dsn)
-    payload = await refresh_auth_backend.get_strategy().read_token(
-        refresh_token, user_manager
-    )
+    refresh_strategy = refresh_auth_backend.get_strategy()
+    claims = refresh_strategy.read_claims(request.cookies.get('refresh_token'))
 
-    if not payload:
+    if claims is None or 'fam' not in claims or claims['sub'] != str(user.id):
+        REFRESHES.labels('failure').inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Недействительный токен обновления',
         )
 
-    stored_refresh_token = await redis.get(f'refresh_token:{payload.id}')
-
-    if stored_refresh_token.decode('utf-8') != refresh_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail='Недействительный токен обновления',
-        )
+    refresh_token, new_claims = refresh_strategy.issue(
+        claims['sub'], claims['fam']
+    )
+    try:
+        await token_service.rotate_refresh_token(claims, new_claims)
+    except HTTPException:
+        REFRESHES.labels('failure').inc()
+        raise
+    response.set_cookie(
+        key='refresh_token', value=refresh_token, httponly=True
+    )
 
-    new_access_token = await auth_backend.get_strategy().write_token(payload)
+    await user_manager.load_access(user)
+    new_access_token = await auth_backend.get_strategy().write_token(user)
+    REFRESHES.labels('success').inc()
 
     return {'access_token': new_access_token}
+
+
+@router.post(
+    '/introspect',
+    tags=['auth'],
+    summary='Introspect Tokens',
+    description=(
+        'Checks a batch of access and refresh tokens. Results are returned '
+        'in the order of the input tokens. Superuser only.'
+    ),
+    response_model=TokenIntrospectResponse,
+)
+async def introspect_tokens(
+    body: TokenIntrospectRequest,
+    token_service: TokenService = Depends(get_token_service),
+    principal: Principal = Depends(current_superprincipal),
+) -> TokenIntrospectResponse:
+    """Пакетная проверка токенов для других сервисов.
+
+    Подписи проверяются локально, состояние refresh токенов всего пакета
+    читается из Redis одним запросом.
+
+    Возвращает:
+        TokenIntrospectResponse: Результаты в порядке входных токенов
+    """
+    results = await token_service.introspect(body.tokens)
+    return TokenIntrospectResponse(results=results)
@@ -1,12 +1,7 @@
-from logging import config as logging_config
-
 from pydantic import EmailStr, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from .logger import LOGGING_CONFIG
-
-
-logging_config.dictConfig(LOGGING_CONFIG)
+from .logger import setup_logging
 
 
 class ProjectSettings(BaseSettings):
@@ -53,13 +48,76 @@ class ProjectSettings(BaseSettings):
     first_superuser_password: str | None = None
     jwt_lifetime_seconds: int = 3600
     jwt_refresh_lifetime_seconds: int = 86400
+    # Каталог PEM-ключей для RS256/EdDSA, без него используется HS256
+    jwt_keys_dir: str | None = None
+    jwt_active_kid: str | None = None
+    jwks_max_age_seconds: int = 300
+    introspection_max_batch: int = 1000
+    # Фильтр Блума отозванных access token, размер кратен 8
+    revocation_bloom_bits: int = 2 ** 20
+    revocation_bloom_hashes: int = 7
+    revocation_refresh_interval: float = 5.0
     min_password_length: int = 3
+    user_cache_maxsize: int = 10000
+    user_cache_ttl_seconds: float = 5.0
+    access_cache_ttl_seconds: float = 60.0
+    # Сколько пользователей инвалидировать поименно, больше - весь кеш
+    access_invalidation_max_keys: int = 1000
+    # Предел пар пользователь-роль в одном назначении и число ролей в нем
+    user_role_max_batch: int = 100000
+    user_role_max_roles: int = 100
+    roles_page_size: int = 100
+    roles_page_max_size: int = 1000
+    roles_cache_ttl_seconds: int = 300
+    password_hasher_workers: int = 2
+    password_hasher_max_pending: int = 64
+
+    # Ограничение попыток входа (token bucket): емкость и пополнение
+    login_ip_burst: int = 20
+    login_ip_per_minute: float = 10.0
+    login_email_burst: int = 5
+    login_email_per_minute: float = 5.0
+
+    # История входов
+    auth_history_queue_size: int = 10000
+    auth_history_batch_size: int = 500
+    auth_history_flush_interval: float = 1.0
+    auth_history_export_batch_size: int = 1000
+    # Месячные партиции истории входов
+    auth_history_premake_months: int = 3
+    auth_history_retention_months: int = 12
+    auth_history_detach_expired: bool = False
+    auth_history_maintenance_interval: float = 21600.0
+
+    # Логирование через очередь и фоновый поток
+    log_level: str = 'INFO'
+    log_json: bool = False
+    log_queue_size: int = 10000
+    # При переполнении очереди ждать место вместо отбрасывания записей
+    log_queue_block: bool = False
+    log_queue_block_timeout: float = 0.1
+
+    # Период переноса счетчиков компонентов в метрики Prometheus
+    metrics_refresh_interval: float = 5.0
+
+    # Профилирование запросов с ответом в заголовке Server-Timing:
+    # для всех запросов или по заголовку X-Profile-Token, подписанному
+    # profiling_secret. Доля profiling_sample_rate снимается cProfile.
+    profiling_enabled: bool = False
+    profiling_secret: str | None = None
+    profiling_dump_dir: str | None = None
+    profiling_sample_rate: float = 0.0
 
     model_config = SettingsConfigDict(
         env_file='.env', env_file_encoding='utf-8', extra='ignore'
     )
     debug: bool = False
 
+    @property
+    def profiling_available(self) -> bool:
+        """Профилирование включено или может быть запрошено заголовком."""
+        return self.profiling_enabled or self.profiling_secret is not None
+
 
 class RedisSettings(BaseSettings):
     """Настройки Redis."""
@@ -71,6 +129,22 @@ class RedisSettings(BaseSettings):
     db_index: int
     dsn: str = ''
 
+    # Пул соединений
+    max_connections: int = 100
+    health_check_interval: int = 30
+    socket_timeout: float = 5.0
+    socket_connect_timeout: float = 2.0
+
+    # Инвалидация локальных кешей через pub/sub
+    invalidation_channel: str = 'cache-invalidation'
+    invalidation_fallback_ttl: float = 1.0
+    invalidation_reconnect_delay: float = 0.5
+    invalidation_reconnect_max_delay: float = 30.0
+
+    # Предохранитель: ошибок подряд до отказа и пауза до пробного запроса
+    breaker_failure_threshold: int = 5
+    breaker_recovery_timeout: float = 5.0
+
     model_config = SettingsConfigDict(
         env_file='.env', extra='ignore', env_prefix='REDIS_'
     )
@@ -90,6 +164,39 @@ class PostgresSettings(BaseSettings):
     password: str
     dsn: str = ''
 
+    # Пул соединений SQLAlchemy
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    warmup_connections: int = 5
+
+    # Параметры asyncpg
+    statement_cache_size: int = 100
+    prepared_statement_cache_size: int = 100
+    command_timeout: float | None = 30.0
+    # Совместимость с PgBouncer в режиме pool_mode=transaction
+    pgbouncer: bool = False
+
+    # Журнал медленных запросов и бюджет SQL-запросов на HTTP-запрос
+    query_log_enabled: bool = True
+    slow_query_threshold_ms: float = 200.0
+    query_budget_per_request: int = 20
+    query_log_max_fingerprints: int = 1000
+
+    # Предохранитель: ошибок подряд до отказа и пауза до пробного запроса
+    breaker_failure_threshold: int = 5
+    breaker_recovery_timeout: float = 5.0
+
+    # Реплики для чтения: host или host:port с учетными данными основной
+    # БД, либо полные DSN. DSN из replica_hosts добавляются к replica_dsns
+    replica_hosts: list[str] = Field(default_factory=list)
+    replica_dsns: list[str] = Field(default_factory=list)
+    replica_max_lag_seconds: float = 5.0
+    replica_check_interval: float = 5.0
+    replica_sticky_seconds: int = 5
+
     model_config = SettingsConfigDict(
         env_file='.env', extra='ignore', env_prefix='POSTGRES_'
     )
@@ -97,6 +204,14 @@ class PostgresSettings(BaseSettings):
     def model_post_init(self, __context: any) -> None:
         """Формируем DSN после загрузки переменных."""
         self.dsn = f'postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.db_name}'
+        self.replica_dsns = list(self.replica_dsns)
+        for host in self.replica_hosts:
+            if ':' not in host:
+                host = f'{host}:{self.port}'
+            self.replica_dsns.append(
+                f'postgresql+asyncpg://{self.user}:{self.password}'
+                f'@{host}/{self.db_name}'
+            )
 
 
 class AuthSettings(BaseSettings):
@@ -112,6 +227,17 @@ class AuthSettings(BaseSettings):
 
 
 project_settings = ProjectSettings()
+
 redis_settings = RedisSettings()
 postgres_settings = PostgresSettings()
 auth_settings = AuthSettings()
+
+"""Обработчик корневого логгера, передающий записи в фоновый поток."""
+log_handler = setup_logging(
+    level=project_settings.log_level,
+    json_format=project_settings.log_json,
+    sql_echo=project_settings.debug,
+    queue_size=project_settings.log_queue_size,
+    block=project_settings.log_queue_block,
+    block_timeout=project_settings.log_queue_block_timeout,
+)
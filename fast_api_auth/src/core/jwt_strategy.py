@@ -0,0 +1,145 @@
+import time
+from uuid import UUID, uuid4
+
+import jwt
+from fastapi_users import BaseUserManager
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.exceptions import InvalidID, UserNotExists
+
+from src.core.keys import KeyRing, key_ring
+from src.core.revocation import RevocationList, revocation_list
+from src.models.user import User
+
+
+class KeyRingJWTStrategy(JWTStrategy[User, UUID]):
+    """JWT-стратегия, подписывающая токены ключами из `KeyRing`.
+
+    В асимметричном режиме токены несут `kid` и проверяются открытыми
+    ключами, которые сервисы получают из JWKS. Каждый токен получает
+    уникальный `jti`, по которому его можно отозвать до истечения срока.
+    Секрет HS256 тоже берется из `keys`, отдельно он не передается.
+    """
+
+    def __init__(
+            self,
+            lifetime_seconds: int | None,
+            keys: KeyRing = key_ring,
+            revocations: RevocationList = revocation_list,
+        ) -> None:
+        super().__init__(secret=keys.secret, lifetime_seconds=lifetime_seconds)
+        self.keys = keys
+        self.revocations = revocations
+
+    async def read_token(
+            self,
+            token: str | None,
+            user_manager: BaseUserManager[User, UUID],
+        ) -> User | None:
+        """Проверяет токен и загружает пользователя из `sub`."""
+        claims = self.read_claims(token)
+        if claims is None or claims.get('sub') is None:
+            return None
+        if await self.revocations.is_revoked(claims.get('jti')):
+            return None
+        try:
+            return await user_manager.get(user_manager.parse_id(claims['sub']))
+        except (UserNotExists, InvalidID):
+            return None
+
+    async def write_token(self, user: User) -> str:
+        """Выпускает токен пользователя."""
+        return self.encode({'sub': str(user.id)})
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        """Отзывает токен до истечения его срока действия (logout)."""
+        claims = self.read_claims(token)
+        if claims is None or 'jti' not in claims or 'exp' not in claims:
+            return
+        await self.revocations.revoke(claims['jti'], claims['exp'])
+
+    def read_claims(self, token: str | None) -> dict[str, any] | None:
+        """Проверяет подпись токена и возвращает его claims.
+
+        Returns:
+            dict | None: Claims токена или None, если токен недействителен
+
+        """
+        if token is None:
+            return None
+        try:
+            return self.keys.decode(token, self.token_audience)
+        except jwt.PyJWTError:
+            return None
+
+    def encode(self, data: dict[str, any]) -> str:
+        """Подписывает токен с claims из `build_payload`."""
+        return self.keys.encode(self.build_payload(data))
+
+    def build_payload(self, data: dict[str, any]) -> dict[str, any]:
+        """Добавляет к данным аудиторию, `jti` и срок действия."""
+        payload = {'aud': self.token_audience, 'jti': uuid4().hex, **data}
+        if self.lifetime_seconds is not None:
+            payload['exp'] = int(time.time()) + self.lifetime_seconds
+        return payload
+
+
+class RefreshJWTStrategy(KeyRingJWTStrategy):
+    """JWT-стратегия refresh токенов с семействами по устройствам.
+
+    Каждый вход открывает новое семейство (`fam`), а обновление выпускает
+    следующий токен того же семейства. Состояние семейств хранит
+    `TokenService`.
+    """
+
+    async def write_token(self, user: User) -> str:
+        """Выпускает refresh token нового семейства."""
+        token, _ = self.issue(str(user.id))
+        return token
+
+    def issue(
+            self, user_id: str, family: str | None = None
+        ) -> tuple[str, dict[str, any]]:
+        """Выпускает refresh token.
+
+        Args:
+            user_id: Идентификатор пользователя
+            family: Семейство токена, None для нового входа
+
+        Returns:
+            tuple: Токен и его claims
+
+        """
+        claims = self.build_payload(
+            {'sub': user_id, 'fam': family or uuid4().hex}
+        )
+        return self.keys.encode(claims), claims
+
+
+class ClaimsJWTStrategy(KeyRingJWTStrategy):
+    """JWT-стратегия, подписывающая в access token данные пользователя.
+
+    Помимо `sub` в токен попадают `is_active`, `is_superuser`,
+    `is_verified`, имена ролей и маска эффективных разрешений `pm`. Это
+    позволяет проверять запросы по одной подписи, без обращения к БД.
+
+    Note:
+        Роли и маска берутся из `User.access`. Если права не загружены,
+        токен выпускается без ролей и разрешений.
+
+    """
+
+    async def write_token(self, user: User) -> str:
+        """Выпускает access token с claims пользователя."""
+        return self.encode({'sub': str(user.id), **self.build_claims(user)})
+
+    @staticmethod
+    def build_claims(user: User) -> dict[str, any]:
+        """Собирает claims пользователя для access token."""
+        access = user.access
+        return {
+            'is_active': user.is_active,
+            'is_superuser': user.is_superuser,
+            'is_verified': user.is_verified,
+            'roles': [] if access is None else list(access.roles),
+            'pm': 0 if access is None else access.mask,
+        }
@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import jwt
+import orjson
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from src.core.config import project_settings
+from src.core.metrics import JWT_DURATION
+
+
+PRIVATE_KEY_SUFFIX = '.pem'
+PUBLIC_KEY_SUFFIX = '.pub.pem'
+
+_ENCODE_DURATION = JWT_DURATION.labels('encode')
+_DECODE_DURATION = JWT_DURATION.labels('decode')
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    """Ключ подписи JWT.
+
+    Attributes:
+        kid: Идентификатор ключа (имя файла без расширения)
+        algorithm: Алгоритм подписи, определяется типом ключа
+        private_key: Закрытый ключ или None для ключа только для проверки
+        public_key: Открытый ключ, публикуется в JWKS
+
+    """
+
+    kid: str
+    algorithm: str
+    private_key: rsa.RSAPrivateKey | ed25519.Ed25519PrivateKey | None
+    public_key: rsa.RSAPublicKey | ed25519.Ed25519PublicKey
+
+    def to_jwk(self) -> dict[str, str]:
+        """Возвращает открытый ключ в формате JWK."""
+        if self.algorithm == 'RS256':
+            jwk = RSAAlgorithm.to_jwk(self.public_key, as_dict=True)
+        else:
+            jwk = OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+        return {**jwk, 'kid': self.kid, 'alg': self.algorithm, 'use': 'sig'}
+
+
+class KeyRing:
+    """Набор ключей для подписи и проверки JWT.
+
+    Без `keys_dir` токены подписываются общим секретом по HS256. С
+    `keys_dir` используются асимметричные ключи из PEM-файлов каталога:
+    `<kid>.pem` с закрытым ключом RSA (RS256) или Ed25519 (EdDSA) и
+    `<kid>.pub.pem` с открытым ключом, который только проверяет подписи.
+    Токены подписываются ключом `active_kid` и несут его в заголовке
+    `kid`, проверка выполняется любым ключом каталога.
+
+    Ротация с перекрытием: новый ключ добавляется в каталог и попадает
+    в JWKS, затем на него переключается `active_kid`. Старый ключ
+    удаляется (или оставляется как `.pub.pem`) не раньше, чем истекут
+    выпущенные им токены.
+    """
+
+    def __init__(
+            self,
+            secret: str,
+            keys_dir: str | None = None,
+            active_kid: str | None = None,
+        ) -> None:
+        self.secret = secret
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self.keys: dict[str, SigningKey] = {}
+        self.jwks: bytes = b'{"keys":[]}'
+        self.load()
+
+    @property
+    def asymmetric(self) -> bool:
+        """Признак подписи асимметричными ключами."""
+        return self.keys_dir is not None
+
+    def load(self) -> None:
+        """Загружает ключи из каталога и пересобирает JWKS.
+
+        Raises:
+            RuntimeError: Если активный ключ не найден или не задан
+
+        """
+        if not self.asymmetric:
+            return
+        keys = {}
+        for path in sorted(Path(self.keys_dir).glob(f'*{PRIVATE_KEY_SUFFIX}')):
+            key = self._load_key(path)
+            keys[key.kid] = key
+
+        signers = [key.kid for key in keys.values() if key.private_key]
+        active_kid = self.active_kid
+        if active_kid is None and len(signers) == 1:
+            active_kid = signers[0]
+        if active_kid not in signers:
+            raise RuntimeError(
+                f'Не найден закрытый ключ подписи JWT {active_kid!r} '
+                f'в {self.keys_dir}'
+            )
+
+        self.active_kid = active_kid
+        self.keys = keys
+        self.jwks = orjson.dumps(
+            {'keys': [key.to_jwk() for key in keys.values()]}
+        )
+
+    def encode(self, payload: dict[str, any]) -> str:
+        """Подписывает payload активным ключом."""
+        with _ENCODE_DURATION.time():
+            if not self.asymmetric:
+                return jwt.encode(payload, self.secret, algorithm='HS256')
+            key = self.keys[self.active_kid]
+            return jwt.encode(
+                payload, key.private_key, algorithm=key.algorithm,
+                headers={'kid': key.kid},
+            )
+
+    def decode(
+            self, token: str, audience: str | list[str]
+        ) -> dict[str, any]:
+        """Проверяет подпись ключом из заголовка `kid` и декодирует токен.
+
+        Raises:
+            jwt.PyJWTError: Если токен недействителен
+
+        """
+        with _DECODE_DURATION.time():
+            if not self.asymmetric:
+                return jwt.decode(
+                    token, self.secret, algorithms=['HS256'],
+                    audience=audience,
+                )
+            kid = jwt.get_unverified_header(token).get('kid')
+            key = self.keys.get(kid)
+            if key is None:
+                raise jwt.InvalidTokenError(f'Unknown key id: {kid}')
+            return jwt.decode(
+                token, key.public_key, algorithms=[key.algorithm],
+                audience=audience,
+            )
+
+    @staticmethod
+    def _load_key(path: Path) -> SigningKey:
+        """Загружает ключ из PEM-файла."""
+        data = path.read_bytes()
+        if path.name.endswith(PUBLIC_KEY_SUFFIX):
+            kid = path.name.removesuffix(PUBLIC_KEY_SUFFIX)
+            private_key = None
+            public_key = serialization.load_pem_public_key(data)
+        else:
+            kid = path.name.removesuffix(PRIVATE_KEY_SUFFIX)
+            private_key = serialization.load_pem_private_key(
+                data, password=None
+            )
+            public_key = private_key.public_key()
+
+        if isinstance(public_key, rsa.RSAPublicKey):
+            algorithm = 'RS256'
+        elif isinstance(public_key, ed25519.Ed25519PublicKey):
+            algorithm = 'EdDSA'
+        else:
+            raise RuntimeError(f'Неподдерживаемый тип ключа в {path}')
+        return SigningKey(kid, algorithm, private_key, public_key)
+
+
+"""Ключи подписи JWT приложения."""
+key_ring = KeyRing(
+    secret=project_settings.secret,
+    keys_dir=project_settings.jwt_keys_dir,
+    active_kid=project_settings.jwt_active_kid,
+)
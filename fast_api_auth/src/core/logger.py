@@ -1,3 +1,14 @@
+import atexit
+import copy
+import logging
+import queue
+from datetime import datetime, timezone
+from logging import config as logging_config
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+
 LOGGING_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
 LOGGING_VERBOSE_FORMAT = (
     '%(asctime)s [%(levelname)s] %(name)s '
@@ -43,3 +54,138 @@ LOGGING_CONFIG = {
         },
     },
 }
+
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class JSONFormatter(logging.Formatter):
+    """Форматирует запись одной строкой JSON через orjson."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Собирает поля записи в JSON-объект."""
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'func': record.funcName,
+            'line': record.lineno,
+            'process': record.process,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        if record.stack_info:
+            entry['stack_info'] = record.stack_info
+        return orjson.dumps(entry).decode()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Обработчик, передающий записи в ограниченную очередь.
+
+    В потоке event loop выполняется только подстановка аргументов в
+    сообщение и форматирование traceback, а форматирование и запись в
+    файл и stdout делает `QueueListener` в отдельном потоке. При
+    переполнении очереди запись отбрасывается или, если `block`, поток
+    ждет место не дольше `timeout` секунд и только потом отбрасывает.
+
+    Attributes:
+        block: Ждать места в очереди вместо отбрасывания записи
+        timeout: Максимальное ожидание места в секундах
+        dropped: Количество отброшенных записей
+
+    """
+
+    def __init__(
+            self,
+            log_queue: queue.Queue,
+            block: bool = False,
+            timeout: float | None = None,
+        ) -> None:
+        super().__init__(log_queue)
+        self.block = block
+        self.timeout = timeout
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Кладет запись в очередь согласно политике переполнения."""
+        try:
+            self.queue.put(record, block=self.block, timeout=self.timeout)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Готовит копию записи для передачи в другой поток.
+
+        В отличие от базовой реализации, traceback остается в
+        `exc_text`, а не дописывается в сообщение: так его получает
+        и текстовый, и JSON-форматтер.
+        """
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(
+                record.exc_info
+            )
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает заполненность очереди и число отброшенных записей."""
+        return {'queued': self.queue.qsize(), 'dropped': self.dropped}
+
+
+def setup_logging(
+        level: str = 'INFO',
+        json_format: bool = False,
+        sql_echo: bool = False,
+        queue_size: int = 10000,
+        block: bool = False,
+        block_timeout: float | None = None,
+    ) -> BoundedQueueHandler:
+    """Настраивает логирование через очередь и фоновый поток.
+
+    Обработчики из `LOGGING_CONFIG` переносятся с корневого логгера в
+    `QueueListener`, а на их место ставится `BoundedQueueHandler`.
+    Поток записи останавливается при выходе из процесса, дописав
+    оставшиеся в очереди записи.
+
+    Args:
+        level: Уровень корневого логгера
+        json_format: Писать записи в JSON вместо текста
+        sql_echo: Логировать SQL-запросы SQLAlchemy на уровне INFO
+        queue_size: Максимальный размер очереди записей
+        block: Ждать места в переполненной очереди вместо отбрасывания
+        block_timeout: Максимальное ожидание места в секундах
+
+    Returns:
+        BoundedQueueHandler: Обработчик корневого логгера
+
+    """
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config['formatters']['json'] = {'()': JSONFormatter}
+    if json_format:
+        for handler in config['handlers'].values():
+            handler['formatter'] = 'json'
+    config['loggers']['']['level'] = level
+    config['loggers']['sqlalchemy.engine'] = {
+        'level': 'INFO' if sql_echo else 'WARNING',
+    }
+    logging_config.dictConfig(config)
+
+    root = logging.getLogger()
+    handler = BoundedQueueHandler(
+        queue.Queue(queue_size), block=block, timeout=block_timeout
+    )
+    listener = QueueListener(
+        handler.queue, *root.handlers, respect_handler_level=True
+    )
+    root.handlers = [handler]
+    listener.start()
+    atexit.register(listener.stop)
+    return handler
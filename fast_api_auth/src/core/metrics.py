@@ -0,0 +1,155 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# Модуль импортируется и процессами пула хеширования, поэтому не зависит
+# от настроек приложения. Режим нескольких воркеров включается переменной
+# окружения PROMETHEUS_MULTIPROC_DIR: значения пишутся в общий каталог и
+# суммируются при выдаче. Метрики с метками не создают файлов, пока
+# процесс не записал в них значение.
+
+"""Ответы HTTP по маршрутам."""
+REQUEST_DURATION = Histogram(
+    'auth_http_request_duration_seconds',
+    'HTTP request latency by route',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+"""Ожидание соединения из пула SQLAlchemy."""
+DB_POOL_CHECKOUT = Histogram(
+    'auth_db_pool_checkout_seconds',
+    'Time to check out a connection from the pool',
+    ['pool'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+"""Соединения, выданные из пула."""
+DB_POOL_CHECKED_OUT = Gauge(
+    'auth_db_pool_checked_out',
+    'Connections currently checked out of the pool',
+    ['pool'],
+    multiprocess_mode='livesum',
+)
+
+"""Команды Redis и pipeline."""
+REDIS_COMMAND_DURATION = Histogram(
+    'auth_redis_command_duration_seconds',
+    'Redis command latency',
+    ['command'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+
+"""Хеширование и проверка паролей, включая ожидание в очереди пула."""
+PASSWORD_HASH_DURATION = Histogram(
+    'auth_password_hash_duration_seconds',
+    'Password hashing and verification latency',
+    ['operation'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+"""Подпись и проверка JWT."""
+JWT_DURATION = Histogram(
+    'auth_jwt_duration_seconds',
+    'JWT encode and decode latency',
+    ['operation'],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01),
+)
+
+"""Попытки входа по результату."""
+LOGINS = Counter('auth_logins', 'Login attempts', ['result'])
+
+"""Обновления access token по результату."""
+REFRESHES = Counter('auth_token_refreshes', 'Token refreshes', ['result'])
+
+"""Счетчики компонентов из их методов `stats()`."""
+COMPONENT_STATS = Gauge(
+    'auth_component_stat',
+    'Counters reported by caches, pools and queues',
+    ['component', 'stat'],
+    multiprocess_mode='livesum',
+)
+
+"""Состояние предохранителей: 0 - closed, 1 - half-open, 2 - open."""
+BREAKER_STATE = Gauge(
+    'auth_circuit_breaker_state',
+    'Circuit breaker state (0 closed, 1 half-open, 2 open)',
+    ['name'],
+    multiprocess_mode='livemax',
+)
+
+
+def multiprocess_enabled() -> bool:
+    """Проверяет, включен ли режим нескольких воркеров."""
+    return 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Формирует метрики в текстовом формате Prometheus.
+
+    Returns:
+        tuple: Тело ответа и его Content-Type
+
+    """
+    registry = REGISTRY
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Удаляет live-метрики завершающегося воркера."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class PrometheusMiddleware:
+    """ASGI middleware, измеряющее время ответа по шаблону маршрута.
+
+    Метка `route` берется из найденного маршрута (`/roles/{role_id}`),
+    а не из пути запроса, чтобы число рядов не зависело от
+    идентификаторов. Запросы без маршрута учитываются как `<unmatched>`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+            self, scope: Scope, receive: Receive, send: Send
+        ) -> None:
+        """Передает запрос приложению и учитывает его длительность."""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            REQUEST_DURATION.labels(
+                scope['method'],
+                getattr(route, 'path', '<unmatched>'),
+                status_code,
+            ).observe(time.perf_counter() - start)
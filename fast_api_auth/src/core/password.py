@@ -0,0 +1,142 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+from fastapi_users.password import PasswordHelper
+
+from src.core.metrics import PASSWORD_HASH_DURATION
+from src.core.profiling import record
+
+
+R = TypeVar('R')
+
+# Модуль импортируется процессами пула, поэтому не зависит от настроек
+# приложения: в дочерних процессах нужен только сам хешер. Метрики
+# пишутся только в процессе воркера.
+_password_helper = PasswordHelper()
+
+
+def _hash(password: str) -> str:
+    """Хеширует пароль в процессе пула."""
+    return _password_helper.hash(password)
+
+
+def _verify_and_update(
+        plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+    """Проверяет пароль в процессе пула."""
+    return _password_helper.verify_and_update(plain_password, hashed_password)
+
+
+class PoolPasswordHelper(PasswordHelper):
+    """Хешер паролей, выполняющий работу в пуле процессов.
+
+    Хеширование и проверка паролей намеренно медленные и при выполнении в
+    event loop блокируют все остальные запросы воркера. Здесь они уходят
+    в `ProcessPoolExecutor`, а семафор ограничивает число задач в пуле.
+    Если очередь ожидающих переполнена, запрос сразу получает 503.
+
+    Attributes:
+        workers: Количество процессов пула
+        max_pending: Максимальная длина очереди ожидающих запросов
+        waiting: Текущая длина очереди
+        in_flight: Количество задач, выполняемых пулом
+        rejected: Количество запросов, отклоненных из-за переполнения
+
+    Note:
+        До вызова `start` (например, в CLI-скриптах) работа выполняется в
+        отдельном потоке.
+
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        super().__init__()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.waiting = 0
+        self.in_flight = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(workers)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        """Запускает пул процессов."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('forkserver'),
+            )
+
+    def stop(self) -> None:
+        """Останавливает пул, отменяя задачи, которые еще не начались."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def hash_async(self, password: str) -> str:
+        """Хеширует пароль, не блокируя event loop."""
+        start = time.perf_counter()
+        try:
+            return await self._submit(_hash, password)
+        finally:
+            elapsed = time.perf_counter() - start
+            PASSWORD_HASH_DURATION.labels('hash').observe(elapsed)
+            record('hash', elapsed)
+
+    async def verify_and_update_async(
+            self, plain_password: str, hashed_password: str
+        ) -> tuple[bool, str | None]:
+        """Проверяет пароль, не блокируя event loop."""
+        start = time.perf_counter()
+        try:
+            return await self._submit(
+                _verify_and_update, plain_password, hashed_password
+            )
+        finally:
+            elapsed = time.perf_counter() - start
+            PASSWORD_HASH_DURATION.labels('verify').observe(elapsed)
+            record('hash', elapsed)
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает метрики очереди хеширования."""
+        return {
+            'workers': self.workers,
+            'waiting': self.waiting,
+            'in_flight': self.in_flight,
+            'rejected': self.rejected,
+        }
+
+    async def _submit(self, func: Callable[..., R], *args: str) -> R:
+        """Выполняет функцию в пуле с ограничением очереди.
+
+        Raises:
+            HTTPException: 503, если очередь ожидающих переполнена
+
+        """
+        if self.waiting >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Сервис перегружен, повторите попытку позже',
+                headers={'Retry-After': '1'},
+            )
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            if self._executor is None:
+                return await asyncio.to_thread(func, *args)
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
@@ -0,0 +1,290 @@
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import inspect
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Callable, ParamSpec, TypeVar
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+P = ParamSpec('P')
+R = TypeVar('R')
+
+logger = logging.getLogger(__name__)
+
+"""Заголовок запроса с подписанным разрешением на профилирование."""
+PROFILE_HEADER = 'x-profile-token'
+
+# Фазы текущего запроса: имя -> [суммарная длительность, количество].
+# None, если запрос не профилируется: тогда точки замера ограничиваются
+# одним чтением ContextVar.
+_timings: ContextVar[dict[str, list[float]] | None] = ContextVar(
+    'profiling_timings', default=None
+)
+_profiler_active = False
+
+
+def profiling_active() -> bool:
+    """Проверяет, профилируется ли текущий запрос."""
+    return _timings.get() is not None
+
+
+def record(phase: str, seconds: float) -> None:
+    """Добавляет длительность к фазе текущего запроса, если он профилируется.
+
+    Фазы могут пересекаться: например, время `db` внутри `auth`
+    учитывается в обеих.
+    """
+    timings = _timings.get()
+    if timings is None:
+        return
+    entry = timings.get(phase)
+    if entry is None:
+        timings[phase] = [seconds, 1]
+    else:
+        entry[0] += seconds
+        entry[1] += 1
+
+
+def profiled(phase: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Декоратор, учитывающий время выполнения функции в фазе запроса.
+
+    Сигнатура сохраняется, поэтому декоратор подходит для зависимостей
+    FastAPI.
+    """
+
+    def func_wrapper(func: Callable[P, R]) -> Callable[P, R]:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_inner(*args: P.args, **kwargs: P.kwargs) -> R:
+                if _timings.get() is None:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record(phase, time.perf_counter() - start)
+
+            return async_inner
+
+        @wraps(func)
+        def inner(*args: P.args, **kwargs: P.kwargs) -> R:
+            if _timings.get() is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(phase, time.perf_counter() - start)
+
+        return inner
+
+    return func_wrapper
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Учитывает время SQL-запросов движка в фазе `db`."""
+
+    def before_execute(
+            connection: any,
+            cursor: any,
+            statement: str,
+            parameters: any,
+            context: any,
+            executemany: bool,
+        ) -> None:
+        if _timings.get() is not None:
+            context.profiling_start = time.perf_counter()
+
+    def after_execute(
+            connection: any,
+            cursor: any,
+            statement: str,
+            parameters: any,
+            context: any,
+            executemany: bool,
+        ) -> None:
+        start = getattr(context, 'profiling_start', None)
+        if start is not None:
+            record('db', time.perf_counter() - start)
+
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_execute
+    )
+    event.listen(engine.sync_engine, 'after_cursor_execute', after_execute)
+
+
+def sign_profile_token(secret: str, ttl: int = 300) -> str:
+    """Выпускает значение заголовка `X-Profile-Token`.
+
+    Args:
+        secret: Секрет из настройки `profiling_secret`
+        ttl: Срок действия в секундах
+
+    Returns:
+        str: `<истечение>.<HMAC-SHA256>`
+
+    """
+    expires = str(int(time.time()) + ttl)
+    signature = hmac.new(
+        secret.encode(), expires.encode(), hashlib.sha256
+    ).hexdigest()
+    return f'{expires}.{signature}'
+
+
+def verify_profile_token(secret: str, token: str) -> bool:
+    """Проверяет подпись и срок действия `X-Profile-Token`."""
+    expires, _, signature = token.partition('.')
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(
+        secret.encode(), expires.encode(), hashlib.sha256
+    ).hexdigest()
+    return hmac.compare_digest(signature, expected)
+
+
+class ProfiledORJSONResponse(ORJSONResponse):
+    """ORJSONResponse, учитывающий сериализацию в фазе `serialize`."""
+
+    def render(self, content: any) -> bytes:
+        """Сериализует тело ответа."""
+        if _timings.get() is None:
+            return super().render(content)
+        start = time.perf_counter()
+        body = super().render(content)
+        record('serialize', time.perf_counter() - start)
+        return body
+
+
+class ProfilingMiddleware:
+    """ASGI middleware с разбивкой времени запроса в `Server-Timing`.
+
+    Профилируются все запросы, если включен `always`, или запросы с
+    действительным заголовком `X-Profile-Token`, подписанным `secret`.
+    Часть профилируемых запросов (`sample_rate`) дополнительно
+    выполняется под cProfile, результат сохраняется в `dump_dir`.
+
+    Attributes:
+        always: Профилировать каждый запрос
+        secret: Секрет подписи заголовка, без него заголовок не действует
+        dump_dir: Каталог для файлов cProfile
+        sample_rate: Доля профилируемых запросов, снимаемых cProfile
+
+    Note:
+        cProfile видит весь поток, поэтому в профиль попадают и
+        корутины других запросов, выполнявшиеся в это время. Одновременно
+        снимается не больше одного профиля.
+
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            always: bool = False,
+            secret: str | None = None,
+            dump_dir: str | None = None,
+            sample_rate: float = 0.0,
+        ) -> None:
+        self.app = app
+        self.always = always
+        self.secret = secret
+        self.dump_dir = Path(dump_dir) if dump_dir else None
+        self.sample_rate = sample_rate
+
+    async def __call__(
+            self, scope: Scope, receive: Receive, send: Send
+        ) -> None:
+        """Выполняет запрос, при необходимости профилируя его."""
+        if scope['type'] != 'http' or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        timings: dict[str, list[float]] = {}
+        token = _timings.set(timings)
+        profiler = self._start_profiler()
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                MutableHeaders(scope=message).append(
+                    'Server-Timing',
+                    self._server_timing(timings, time.perf_counter() - start),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(token)
+            if profiler is not None:
+                await self._dump_profile(profiler, scope)
+
+    def _requested(self, scope: Scope) -> bool:
+        """Проверяет, нужно ли профилировать запрос."""
+        if self.always:
+            return True
+        if self.secret is None:
+            return False
+        token = Headers(scope=scope).get(PROFILE_HEADER)
+        return token is not None and verify_profile_token(self.secret, token)
+
+    def _start_profiler(self) -> cProfile.Profile | None:
+        """Запускает cProfile для выбранной доли запросов."""
+        global _profiler_active
+        if (
+            self.dump_dir is None
+            or _profiler_active
+            or random.random() >= self.sample_rate
+        ):
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        _profiler_active = True
+        return profiler
+
+    async def _dump_profile(
+            self, profiler: cProfile.Profile, scope: Scope
+        ) -> None:
+        """Останавливает cProfile и сохраняет профиль в файл."""
+        global _profiler_active
+        profiler.disable()
+        _profiler_active = False
+        path_part = re.sub(r'[^A-Za-z0-9]+', '_', scope['path']).strip('_')
+        path = self.dump_dir / (
+            f'{time.strftime("%Y%m%d-%H%M%S")}-{scope["method"]}-'
+            f'{path_part or "root"}-{random.getrandbits(32):08x}.prof'
+        )
+        try:
+            await asyncio.to_thread(self._write_profile, profiler, path)
+        except OSError as error:
+            logger.warning(f'Не удалось сохранить профиль {path}: {error}')
+
+    @staticmethod
+    def _write_profile(profiler: cProfile.Profile, path: Path) -> None:
+        """Записывает профиль на диск."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+
+    @staticmethod
+    def _server_timing(
+            timings: dict[str, list[float]], total: float
+        ) -> str:
+        """Формирует значение заголовка `Server-Timing` в миллисекундах."""
+        metrics = [
+            f'{phase};dur={duration * 1000:.3f};desc="{int(count)}x"'
+            for phase, (duration, count) in timings.items()
+        ]
+        metrics.append(f'total;dur={total * 1000:.3f}')
+        return ', '.join(metrics)
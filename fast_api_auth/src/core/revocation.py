@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import time
+from hashlib import blake2b
+
+from redis import exceptions as redis_exceptions
+
+from src.core.config import auth_settings, project_settings
+from src.db.redis_cache import (
+    CacheInvalidationBus,
+    RedisCacheManager,
+    invalidation_bus,
+    redis_cache_manager,
+)
+
+
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY_PREFIX = 'revoked'
+BLOOM_KEY_PREFIX = 'revoked-bloom'
+
+
+class RevocationList:
+    """Список отозванных access token с локальным фильтром Блума.
+
+    Отозванный `jti` хранится в Redis ключом `revoked:<jti>` с TTL, равным
+    оставшемуся сроку жизни токена, и добавляется в фильтр Блума - битовую
+    карту `revoked-bloom:<эпоха>`. Эпоха длится `period` секунд (не меньше
+    срока жизни access token), поэтому `jti` пишется в фильтры текущей и
+    следующей эпохи: токен истекает раньше, чем закончится следующая, а
+    старые фильтры удаляются по TTL вместо удаления отдельных битов.
+
+    Каждый воркер держит копию фильтров в памяти. Копия обновляется
+    сообщениями шины инвалидации и периодически перечитывается из Redis,
+    если изменился счетчик отзывов эпохи. Частая проверка "токен не
+    отозван" выполняется локально, в Redis обращаемся только при
+    срабатывании фильтра.
+
+    Attributes:
+        manager: Менеджер подключения к Redis
+        bus: Шина инвалидации для рассылки отзывов воркерам
+        bits: Размер фильтра в битах
+        hashes: Количество хеш-функций фильтра
+        period: Длительность эпохи фильтра в секундах
+        refresh_interval: Период перечитывания фильтров из Redis
+        checks: Количество проверок
+        filter_hits: Количество срабатываний локального фильтра
+        false_positives: Срабатывания фильтра на неотозванный токен
+
+    """
+
+    def __init__(
+            self,
+            manager: RedisCacheManager,
+            bus: CacheInvalidationBus,
+            bits: int,
+            hashes: int,
+            period: int,
+            refresh_interval: float,
+        ) -> None:
+        self.manager = manager
+        self.bus = bus
+        self.bits = bits
+        self.hashes = hashes
+        self.period = period
+        self.refresh_interval = refresh_interval
+        self.checks = 0
+        self.filter_hits = 0
+        self.false_positives = 0
+        self._filters: dict[int, bytearray] = {}
+        self._versions: dict[int, int] = {}
+        self._task: asyncio.Task | None = None
+        bus.subscribe('j', self._add_local)
+
+    @staticmethod
+    def key(jti: str) -> str:
+        """Ключ Redis с отметкой об отзыве токена."""
+        return f'{REVOKED_KEY_PREFIX}:{jti}'
+
+    def might_be_revoked(self, jti: str) -> bool:
+        """Проверяет `jti` по локальному фильтру без обращения к сети.
+
+        Returns:
+            bool: False, если токен точно не отозван. True, если он
+            может быть отозван или фильтр текущей эпохи еще не загружен
+
+        """
+        self.checks += 1
+        bitmap = self._filters.get(self._epoch())
+        if bitmap is None:
+            return True
+        for position in self._positions(jti):
+            if not bitmap[position >> 3] & (0x80 >> (position & 7)):
+                return False
+        self.filter_hits += 1
+        return True
+
+    async def is_revoked(self, jti: str | None) -> bool:
+        """Проверяет, отозван ли токен.
+
+        Токены без `jti` (выпущенные до его появления) не отзываются.
+
+        Note:
+            Если Redis недоступен, токен со срабатыванием фильтра
+            считается отозванным, а при незагруженном фильтре - нет.
+
+        """
+        if jti is None or not self.might_be_revoked(jti):
+            return False
+        loaded = self._epoch() in self._filters
+        client = self.manager.redis_client
+        if client is None:
+            return loaded
+        try:
+            revoked = bool(await client.exists(self.key(jti)))
+        except (redis_exceptions.RedisError, OSError) as error:
+            logger.warning(f'Не удалось проверить отзыв токена: {error}')
+            return loaded
+        if loaded and not revoked:
+            self.false_positives += 1
+        return revoked
+
+    async def revoke(self, jti: str, exp: int) -> None:
+        """Отзывает токен до истечения его срока действия.
+
+        Args:
+            jti: Идентификатор токена
+            exp: Время истечения токена (unix time)
+
+        """
+        now = time.time()
+        ttl = int(exp - now) + 1
+        if ttl <= 0:
+            return
+        epoch = int(now // self.period)
+        async with self.manager.redis_client.pipeline(
+            transaction=False
+        ) as pipe:
+            pipe.set(self.key(jti), 1, ex=ttl)
+            for generation in (epoch, epoch + 1):
+                bloom_key = self._bloom_key(generation)
+                for position in self._positions(jti):
+                    pipe.setbit(bloom_key, position, 1)
+                pipe.incr(f'{bloom_key}:version')
+                pipe.expire(bloom_key, 2 * self.period)
+                pipe.expire(f'{bloom_key}:version', 2 * self.period)
+            await pipe.execute()
+        await self.bus.invalidate('j', jti)
+
+    async def refresh(self) -> None:
+        """Перечитывает из Redis фильтры текущей и следующей эпохи.
+
+        Битовая карта загружается, только если изменился счетчик отзывов
+        эпохи, поэтому в обычном режиме это один `MGET` маленьких ключей.
+        """
+        client = self.manager.redis_client
+        epoch = self._epoch()
+        generations = (epoch, epoch + 1)
+        versions = await client.mget([
+            f'{self._bloom_key(generation)}:version'
+            for generation in generations
+        ])
+        filters = {}
+        for generation, version in zip(generations, versions):
+            version = int(version or 0)
+            bitmap = self._filters.get(generation)
+            if bitmap is None or self._versions.get(generation) != version:
+                data = await client.get(self._bloom_key(generation)) or b''
+                bitmap = bytearray(self.bits // 8)
+                bitmap[:len(data)] = data[:len(bitmap)]
+                self._versions[generation] = version
+            filters[generation] = bitmap
+        self._filters = filters
+        self._versions = {
+            generation: self._versions[generation] for generation in filters
+        }
+
+    async def start(self) -> None:
+        """Загружает фильтры и запускает их периодическое обновление."""
+        if self._task is None:
+            try:
+                await self.refresh()
+            except (redis_exceptions.RedisError, OSError) as error:
+                logger.warning(f'Не удалось загрузить фильтр отзывов: {error}')
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает обновление фильтров."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает счетчики проверок отзыва."""
+        return {
+            'checks': self.checks,
+            'filter_hits': self.filter_hits,
+            'false_positives': self.false_positives,
+        }
+
+    async def _run(self) -> None:
+        """Периодически обновляет фильтры до остановки."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except (redis_exceptions.RedisError, OSError) as error:
+                logger.warning(
+                    f'Не удалось обновить фильтр отзывов: {error}'
+                )
+
+    def _add_local(self, jti: str) -> None:
+        """Добавляет `jti` в локальные фильтры по сообщению шины."""
+        epoch = self._epoch()
+        for generation in (epoch, epoch + 1):
+            bitmap = self._filters.get(generation)
+            if bitmap is None:
+                continue
+            for position in self._positions(jti):
+                bitmap[position >> 3] |= 0x80 >> (position & 7)
+
+    def _positions(self, jti: str) -> list[int]:
+        """Вычисляет позиции битов `jti` двойным хешированием.
+
+        Нумерация битов совпадает с `SETBIT`: бит 0 - старший бит
+        первого байта.
+        """
+        digest = blake2b(jti.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return [
+            (first + index * second) % self.bits
+            for index in range(self.hashes)
+        ]
+
+    def _epoch(self) -> int:
+        """Номер текущей эпохи фильтра."""
+        return int(time.time() // self.period)
+
+    @staticmethod
+    def _bloom_key(epoch: int) -> str:
+        """Ключ Redis с фильтром эпохи."""
+        return f'{BLOOM_KEY_PREFIX}:{epoch}'
+
+
+"""Список отозванных access token, обновление запускается в lifespan."""
+revocation_list = RevocationList(
+    redis_cache_manager,
+    invalidation_bus,
+    bits=project_settings.revocation_bloom_bits,
+    hashes=project_settings.revocation_bloom_hashes,
+    period=auth_settings.jwt_lifetime_seconds,
+    refresh_interval=project_settings.revocation_refresh_interval,
+)
@@ -3,6 +3,7 @@ from typing import Annotated, AsyncGenerator, Union
 from uuid import UUID
 
 from fastapi import Depends, Request, Response
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import (
     BaseUserManager,
     FastAPIUsers,
@@ -12,41 +13,57 @@ from fastapi_users import (
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
-    JWTStrategy,
 )
+from fastapi_users.exceptions import UserAlreadyExists, UserNotExists
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from redis import asyncio as aioredis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import auth_settings, project_settings
-from src.db.postgres import get_async_session
-from src.db.redis_cache import RedisClientFactory
-from src.models.auth_history import AuthHistory
+from src.core.jwt_strategy import ClaimsJWTStrategy, RefreshJWTStrategy
+from src.core.metrics import LOGINS
+from src.core.password import PoolPasswordHelper
+from src.core.profiling import profiled
+from src.db.permission_cache import get_user_access
+from src.db.postgres import (
+    SessionRouter,
+    get_async_session,
+    get_session_router,
+)
+from src.db.redis_cache import get_redis_client
+from src.db.user_cache import CachedSQLAlchemyUserDatabase, invalidate_user
 from src.models.user import User
 from src.schemas.user_schema import UserCreate
+from src.services.auth_history_service import auth_history_writer
+from src.services.token_service import TokenService
 
 
 async def get_user_db(
-    session: Annotated[AsyncSession, Depends(get_async_session)]
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    sessions: Annotated[SessionRouter, Depends(get_session_router)],
 ) -> AsyncGenerator[SQLAlchemyUserDatabase, None]:
-    """Получает базу данных пользователей SQLAlchemy."""
-    yield SQLAlchemyUserDatabase(session, User)
+    """Получает базу данных пользователей SQLAlchemy с кешем по id.
+
+    Промахи кеша по id читаются с реплики, если она доступна.
+    """
+    yield CachedSQLAlchemyUserDatabase(
+        session, read_session=sessions.reader
+    )
 
 
 bearer_transport = BearerTransport(tokenUrl='/auth/v1/jwt/login')
 
 
-def get_jwt_strategy() -> JWTStrategy:
+def get_jwt_strategy() -> ClaimsJWTStrategy:
     """Возвращает стратегию JWT для аутентификации."""
-    return JWTStrategy(
-        secret=auth_settings.secret,
+    return ClaimsJWTStrategy(
         lifetime_seconds=auth_settings.jwt_lifetime_seconds
     )
 
 
-def get_refresh_jwt_strategy() -> JWTStrategy:
+def get_refresh_jwt_strategy() -> RefreshJWTStrategy:
     """Возвращает стратегию JWT для обновления токена."""
-    return JWTStrategy(
-        secret=project_settings.secret,
+    return RefreshJWTStrategy(
         lifetime_seconds=project_settings.jwt_refresh_lifetime_seconds
     )
 
@@ -64,8 +81,58 @@ refresh_auth_backend = AuthenticationBackend(
 )
 
 
+"""Хешер паролей воркера, пул процессов запускается в lifespan."""
+password_helper = PoolPasswordHelper(
+    workers=project_settings.password_hasher_workers,
+    max_pending=project_settings.password_hasher_max_pending,
+)
+
+
 class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
-    """Менеджер пользователей, наследующий UUIDIDMixin и BaseUserManager."""
+    """Менеджер пользователей, наследующий UUIDIDMixin и BaseUserManager.
+
+    Хеширование и проверка паролей выполняются через `PoolPasswordHelper`
+    вне event loop, поэтому `create`, `authenticate` и `_update`
+    переопределены.
+    """
+
+    password_helper: PoolPasswordHelper
+
+    def __init__(
+            self,
+            user_db: SQLAlchemyUserDatabase,
+            redis: aioredis.Redis,
+            password_helper: PoolPasswordHelper = password_helper,
+        ) -> None:
+        super().__init__(user_db, password_helper)
+        self.redis = redis
+
+    async def create(
+            self,
+            user_create: UserCreate,
+            safe: bool = False,
+            request: Request | None = None,
+        ) -> User:
+        """Создает пользователя, хешируя пароль в пуле процессов."""
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop('password')
+        user_dict['hashed_password'] = await self.password_helper.hash_async(
+            password
+        )
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
 
     async def validate_password(
             self, password: str, user: Union[UserCreate, User]
@@ -83,44 +150,117 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
                 reason='Пароль не может содержать ваш email'
             )
 
+    async def authenticate(
+            self, credentials: OAuth2PasswordRequestForm
+        ) -> User | None:
+        """Аутентифицирует пользователя и загружает его права для токена."""
+        try:
+            user = await self.get_by_email(credentials.username)
+        except UserNotExists:
+            # Хешируем пароль, чтобы время ответа не выдавало наличие email
+            await self.password_helper.hash_async(credentials.password)
+            LOGINS.labels('failure').inc()
+            return None
+
+        verified, updated_password_hash = (
+            await self.password_helper.verify_and_update_async(
+                credentials.password, user.hashed_password
+            )
+        )
+        if not verified:
+            LOGINS.labels('failure').inc()
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(
+                user, {'hashed_password': updated_password_hash}
+            )
+
+        await self.load_access(user)
+        LOGINS.labels('success' if user.is_active else 'inactive').inc()
+        return user
+
+    async def _update(self, user: User, update_dict: dict[str, any]) -> User:
+        """Обновляет пользователя, хешируя новый пароль в пуле процессов."""
+        update_dict = dict(update_dict)
+        password = update_dict.pop('password', None)
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict['hashed_password'] = (
+                await self.password_helper.hash_async(password)
+            )
+        return await super()._update(user, update_dict)
+
+    async def load_access(self, user: User) -> None:
+        """Загружает роли и маску прав пользователя для claims токена."""
+        user.access = await get_user_access(self.user_db.session, user.id)
+
     async def on_after_register(
             self, user: User, request: Request | None = None
         ) -> None:
         """Выполняется после регистрации пользователя."""
         print(f'Пользователь {user.email} зарегистрирован.')
 
+    async def on_after_update(
+            self,
+            user: User,
+            update_dict: dict[str, any],
+            request: Request | None = None,
+        ) -> None:
+        """Сбрасывает кеш после изменения пользователя.
+
+        Покрывает блокировку (`is_active`), смену прав суперпользователя,
+        email и пароля.
+        """
+        await invalidate_user(user.id)
+
+    async def on_after_verify(
+            self, user: User, request: Request | None = None
+        ) -> None:
+        """Сбрасывает кеш после подтверждения пользователя."""
+        await invalidate_user(user.id)
+
+    async def on_after_reset_password(
+            self, user: User, request: Request | None = None
+        ) -> None:
+        """Сбрасывает кеш после сброса пароля."""
+        await invalidate_user(user.id)
+
+    async def on_after_delete(
+            self, user: User, request: Request | None = None
+        ) -> None:
+        """Сбрасывает кеш после удаления пользователя."""
+        await invalidate_user(user.id)
+
     async def on_after_login(
             self,
             user: User,
             request: Request | None = None,
             response: Response | None = None
         ) -> None:
-        """Выполняется после входа пользователя в систему."""
-        redis = await RedisClientFactory.create(project_settings.redis_dsn)
-        refresh_token = await refresh_auth_backend.get_strategy().write_token(
-            user
+        """Выдает refresh token нового семейства (устройства).
+
+        Refresh токены остальных устройств пользователя остаются
+        действительными.
+        """
+        refresh_token, claims = refresh_auth_backend.get_strategy().issue(
+            str(user.id)
         )
+        await TokenService(self.redis).store_refresh_token(claims)
         response.set_cookie(
             key='refresh_token', value=refresh_token, httponly=True
         )
 
-        async for session in get_async_session():
-            auth_entry = AuthHistory(
-                user_id=user.id,
-                user_agent=request.headers.get('User-Agent'),
-                timestamp=datetime.now()
-            )
-            session.add(auth_entry)
-            await session.commit()
-
-        await redis.set(f'refresh_token:{user.id}', refresh_token)
+        auth_history_writer.submit(
+            user.id, request.headers.get('User-Agent', ''), datetime.now()
+        )
 
 
 async def get_user_manager(
     user_db: SQLAlchemyUserDatabase = Depends(get_user_db),
+    redis: aioredis.Redis = Depends(get_redis_client),
 ) -> AsyncGenerator[UserManager, None]:
     """Получает менеджер пользователей."""
-    yield UserManager(user_db)
+    yield UserManager(user_db, redis)
 
 
 fastapi_users = FastAPIUsers[User, UUID](
@@ -128,5 +268,7 @@ fastapi_users = FastAPIUsers[User, UUID](
     [auth_backend, refresh_auth_backend],
 )
 
-current_user = fastapi_users.current_user(active=True)
-current_superuser = fastapi_users.current_user(active=True, superuser=True)
+current_user = profiled('auth')(fastapi_users.current_user(active=True))
+current_superuser = profiled('auth')(
+    fastapi_users.current_user(active=True, superuser=True)
+)
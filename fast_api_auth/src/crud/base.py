@@ -5,6 +5,8 @@ from fastapi.encoders import jsonable_encoder
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.db.abstract_db import Page
+from src.db.postgres_dao import PostgresDAO
 from src.models.user import User
 
 
@@ -28,10 +30,30 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
         return db_obj.scalars().first()
 
-    async def get_multi(self, session: AsyncSession) -> list[ModelType]:
-        """Получить все объекты."""
-        db_objs = await session.execute(select(self.model))
-        return db_objs.scalars().all()
+    async def get_multi(
+        self,
+        session: AsyncSession,
+        limit: int = 50,
+        cursor: str | None = None,
+        sort: list[dict[str, str]] | None = None,
+        filters: dict[str, any] | None = None,
+    ) -> Page:
+        """Получить страницу объектов с keyset-пагинацией.
+
+        Объекты возвращаются словарями колонок. Фильтры и сортировки
+        ограничены белым списком таблицы в `PostgresDAO`.
+
+        Raises:
+            ValueError: Если курсор, фильтр или сортировка неверны
+
+        """
+        return await PostgresDAO(session).search(
+            self.model.__tablename__,
+            cursor=cursor,
+            limit=limit,
+            sort=sort,
+            filters=filters,
+        )
 
     async def create(
         self,
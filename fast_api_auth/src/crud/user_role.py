@@ -0,0 +1,77 @@
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud.base import CRUDBase
+from src.models.role import Role, UserRole
+from src.models.user import User
+
+
+def _uuid_array(name: str, values: list[UUID]) -> sa.BindParameter:
+    """Передает список id одним параметром-массивом.
+
+    Для `= ANY(:ids)` число параметров запроса не зависит от размера
+    списка, в отличие от `IN (...)`.
+    """
+    return sa.bindparam(name, values, type_=postgresql.ARRAY(sa.UUID()))
+
+
+class CRUDUserRole(CRUDBase[UserRole, None, None]):
+    """CRUD для связей пользователей и ролей с массовыми операциями."""
+
+    async def assign_many(
+            self,
+            user_ids: list[UUID],
+            role_ids: list[UUID],
+            session: AsyncSession,
+        ) -> int:
+        """Назначает роли пользователям одним INSERT ... SELECT.
+
+        Несуществующие пользователи и роли пропускаются, уже назначенные
+        пары не дублируются (ON CONFLICT DO NOTHING). Декартово
+        произведение пользователей и ролей задано явным JOIN ON true.
+
+        Returns:
+            int: Количество созданных связей
+
+        """
+        users = _uuid_array('user_ids', user_ids)
+        roles = _uuid_array('role_ids', role_ids)
+        result = await session.execute(
+            postgresql.insert(UserRole)
+            .from_select(
+                ['id', 'user_id', 'role_id'],
+                sa.select(sa.func.gen_random_uuid(), User.id, Role.id)
+                .select_from(sa.join(User, Role, sa.true()))
+                .where(User.id == sa.any_(users), Role.id == sa.any_(roles)),
+            )
+            .on_conflict_do_nothing(index_elements=['user_id', 'role_id'])
+        )
+        await session.commit()
+        return result.rowcount
+
+    async def unassign_many(
+            self,
+            user_ids: list[UUID],
+            role_ids: list[UUID],
+            session: AsyncSession,
+        ) -> int:
+        """Снимает роли с пользователей одним DELETE.
+
+        Returns:
+            int: Количество удаленных связей
+
+        """
+        result = await session.execute(
+            sa.delete(UserRole).where(
+                UserRole.user_id == sa.any_(_uuid_array('user_ids', user_ids)),
+                UserRole.role_id == sa.any_(_uuid_array('role_ids', role_ids)),
+            )
+        )
+        await session.commit()
+        return result.rowcount
+
+
+user_role_crud = CRUDUserRole(UserRole)
@@ -1,11 +1,27 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+
+@dataclass(frozen=True, slots=True)
+class Page:
+    """Страница результатов поиска.
+
+    Attributes:
+        items: Найденные объекты
+        next_cursor: Курсор следующей страницы или None для последней
+
+    """
+
+    items: list[dict[str, any]]
+    next_cursor: str | None
 
 
 class AbstractDAO(ABC):
     """Абстрактный DAO для операций поиска в БД."""
 
     @abstractmethod
-    async def get(self, table: str, id_obj: str) -> dict[str, str] | None:
+    async def get(self, table: str, id_obj: str) -> dict[str, any] | None:
         """Получение объекта по ID из указанной таблицы."""
         raise NotImplementedError
 
@@ -13,10 +29,21 @@ class AbstractDAO(ABC):
     async def search(
         self,
         table: str,
-        offset: int = 0,
+        cursor: str | None = None,
         limit: int = 50,
         sort: list[dict[str, str]] | None = None,
         filters: dict[str, any] | None = None,
-    ) -> list[dict[str, any]]:
-        """Поиск объектов в таблице."""
+    ) -> Page:
+        """Поиск объектов в таблице с пагинацией по курсору."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream(
+        self,
+        table: str,
+        sort: list[dict[str, str]] | None = None,
+        filters: dict[str, any] | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict[str, any]]:
+        """Потоковое чтение всех найденных объектов."""
         raise NotImplementedError
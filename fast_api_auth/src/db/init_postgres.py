@@ -4,13 +4,14 @@ from fastapi_users.exceptions import UserAlreadyExists
 from pydantic import EmailStr
 
 from src.core.config import auth_settings
-from src.core.user_core import get_user_db, get_user_manager
+from src.core.user_core import get_user_manager
 from src.db.postgres import get_async_session
+from src.db.redis_cache import get_redis_client
+from src.db.user_cache import CachedSQLAlchemyUserDatabase
 from src.schemas.user_schema import UserCreate
 
 
 get_async_session_context = contextlib.asynccontextmanager(get_async_session)
-get_user_db_context = contextlib.asynccontextmanager(get_user_db)
 get_user_manager_context = contextlib.asynccontextmanager(get_user_manager)
 
 
@@ -31,17 +32,20 @@ async def create_user(
         обрабатывается и функция завершается без ошибки.
 
     """
+    redis = await get_redis_client()
     try:
         async with get_async_session_context() as session:
-            async with get_user_db_context(session) as user_db:
-                async with get_user_manager_context(user_db) as user_manager:
-                    await user_manager.create(
-                        UserCreate(
-                            email=email,
-                            password=password,
-                            is_superuser=is_superuser
-                        )
+            user_db = CachedSQLAlchemyUserDatabase(session)
+            async with get_user_manager_context(
+                user_db, redis
+            ) as user_manager:
+                await user_manager.create(
+                    UserCreate(
+                        email=email,
+                        password=password,
+                        is_superuser=is_superuser
                     )
+                )
     except UserAlreadyExists:
         pass
 
@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import re
+import zlib
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.core.config import project_settings
+from src.db.postgres import engine
+
+
+logger = logging.getLogger(__name__)
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца, отстоящего от `month` на `months`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Имя месячной партиции, например `auth_history_p2026_10`."""
+    return f'{table}_p{month:%Y_%m}'
+
+
+class MonthlyPartitionManager:
+    """Обслуживание таблицы, секционированной по месяцам.
+
+    Заранее создает партиции на `premake_months` вперед и удаляет (или
+    только отсоединяет, если `detach_expired`) партиции старше
+    `retention_months`. Одновременно обслуживание выполняет только один
+    воркер: остальные не получают advisory lock и пропускают запуск.
+
+    Записи месяцев без партиции попадают в DEFAULT-партицию
+    `<table>_default`, а не теряются. Обслуживание создает партиции
+    для этих месяцев и переносит в них записи; оставшиеся в DEFAULT
+    строки попадают в лог и в `stats()`.
+
+    Attributes:
+        engine: Движок основной БД
+        table: Секционированная таблица
+        column: Колонка ключа секционирования
+        premake_months: На сколько месяцев вперед создавать партиции
+        retention_months: Сколько месяцев хранить, включая текущий
+        detach_expired: Отсоединять устаревшие партиции вместо удаления
+        interval: Период запуска обслуживания в секундах
+        default_rows: Строк в DEFAULT-партиции после последнего запуска
+
+    """
+
+    def __init__(
+            self,
+            engine: AsyncEngine,
+            table: str,
+            column: str,
+            premake_months: int,
+            retention_months: int,
+            detach_expired: bool,
+            interval: float,
+        ) -> None:
+        self.engine = engine
+        self.table = table
+        self.column = column
+        self.premake_months = premake_months
+        self.retention_months = retention_months
+        self.detach_expired = detach_expired
+        self.interval = interval
+        self.default_rows = 0
+        self._default = f'{table}_default'
+        self._lock_key = zlib.crc32(f'partitions:{table}'.encode())
+        self._name_pattern = re.compile(
+            rf'^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$'
+        )
+        self._task: asyncio.Task | None = None
+
+    async def run(self, today: date | None = None) -> bool:
+        """Создает будущие и удаляет устаревшие партиции.
+
+        Returns:
+            bool: False, если обслуживание уже выполняет другой процесс
+
+        """
+        current = (today or date.today()).replace(day=1)
+        oldest_kept = add_months(current, 1 - self.retention_months)
+        async with self.engine.begin() as connection:
+            locked = await connection.scalar(
+                text('SELECT pg_try_advisory_xact_lock(:key)'),
+                {'key': self._lock_key},
+            )
+            if not locked:
+                return False
+
+            existing = await self._partitions(connection)
+            months = {
+                add_months(current, offset)
+                for offset in range(self.premake_months + 1)
+            }
+            months.update(
+                month for month in await self._default_months(connection)
+                if month >= oldest_kept
+            )
+            for month in sorted(months - existing.keys()):
+                await self._create(connection, month)
+
+            for month, name in sorted(existing.items()):
+                if month < oldest_kept:
+                    await self._expire(connection, name)
+            if not self.detach_expired:
+                await connection.execute(
+                    text(
+                        f'DELETE FROM "{self._default}" '
+                        f'WHERE "{self.column}" < :oldest'
+                    ),
+                    {'oldest': oldest_kept},
+                )
+            self.default_rows = await connection.scalar(
+                text(f'SELECT count(*) FROM "{self._default}"')
+            )
+        if self.default_rows:
+            logger.warning(
+                f'В партиции {self._default} осталось {self.default_rows} '
+                'записей вне месячных партиций'
+            )
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает число строк в DEFAULT-партиции."""
+        return {'default_rows': self.default_rows}
+
+    async def start(self) -> None:
+        """Выполняет обслуживание и запускает его периодический повтор."""
+        if self._task is None:
+            try:
+                await self.run()
+            except Exception:
+                logger.exception(f'Ошибка обслуживания партиций {self.table}')
+            self._task = asyncio.create_task(self._schedule())
+
+    async def stop(self) -> None:
+        """Останавливает периодическое обслуживание."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _schedule(self) -> None:
+        """Повторяет обслуживание до остановки."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run()
+            except Exception:
+                logger.exception(f'Ошибка обслуживания партиций {self.table}')
+
+    async def _partitions(
+            self, connection: AsyncConnection
+        ) -> dict[date, str]:
+        """Возвращает присоединенные партиции по месяцам."""
+        result = await connection.execute(
+            text(
+                'SELECT c.relname FROM pg_inherits i '
+                'JOIN pg_class c ON c.oid = i.inhrelid '
+                'WHERE i.inhparent = CAST(:table AS regclass)'
+            ),
+            {'table': self.table},
+        )
+        partitions = {}
+        for name in result.scalars():
+            match = self._name_pattern.match(name)
+            if match is not None:
+                year, month = map(int, match.groups())
+                partitions[date(year, month, 1)] = name
+        return partitions
+
+    async def _default_months(
+            self, connection: AsyncConnection
+        ) -> list[date]:
+        """Месяцы записей, попавших в DEFAULT-партицию."""
+        result = await connection.execute(text(
+            f"SELECT DISTINCT CAST(date_trunc('month', \"{self.column}\") "
+            f'AS date) FROM "{self._default}"'
+        ))
+        return list(result.scalars())
+
+    async def _create(self, connection: AsyncConnection, month: date) -> None:
+        """Создает партицию месяца, перенося его записи из DEFAULT.
+
+        Postgres не создает партицию, пока в DEFAULT есть строки ее
+        диапазона, поэтому такие строки сначала копируются в новую
+        таблицу и удаляются из DEFAULT, а таблица затем присоединяется.
+        """
+        name = partition_name(self.table, month)
+        bounds = f"FROM ('{month}') TO ('{add_months(month, 1)}')"
+        in_range = (
+            f'"{self.column}" >= :start AND "{self.column}" < :end'
+        )
+        params = {'start': month, 'end': add_months(month, 1)}
+        moved = await connection.scalar(
+            text(f'SELECT count(*) FROM "{self._default}" WHERE {in_range}'),
+            params,
+        )
+        if not moved:
+            await connection.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" '
+                f'PARTITION OF "{self.table}" FOR VALUES {bounds}'
+            ))
+            logger.info(f'Создана партиция {name}')
+            return
+
+        await connection.execute(text(
+            f'CREATE TABLE "{name}" (LIKE "{self.table}" '
+            'INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        ))
+        await connection.execute(
+            text(
+                f'INSERT INTO "{name}" SELECT * FROM "{self._default}" '
+                f'WHERE {in_range}'
+            ),
+            params,
+        )
+        await connection.execute(
+            text(f'DELETE FROM "{self._default}" WHERE {in_range}'), params
+        )
+        await connection.execute(text(
+            f'ALTER TABLE "{self.table}" ATTACH PARTITION "{name}" '
+            f'FOR VALUES {bounds}'
+        ))
+        logger.warning(
+            f'Создана партиция {name}, из {self._default} перенесено '
+            f'{moved} записей'
+        )
+
+    async def _expire(self, connection: AsyncConnection, name: str) -> None:
+        """Отсоединяет и, если не требуется архив, удаляет партицию."""
+        await connection.execute(text(
+            f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"'
+        ))
+        if self.detach_expired:
+            logger.info(f'Партиция {name} отсоединена')
+            return
+        await connection.execute(text(f'DROP TABLE "{name}"'))
+        logger.info(f'Партиция {name} удалена')
+
+
+"""Обслуживание партиций истории входов, запускается в lifespan."""
+auth_history_partitions = MonthlyPartitionManager(
+    engine,
+    'auth_history',
+    'timestamp',
+    premake_months=project_settings.auth_history_premake_months,
+    retention_months=project_settings.auth_history_retention_months,
+    detach_expired=project_settings.auth_history_detach_expired,
+    interval=project_settings.auth_history_maintenance_interval,
+)
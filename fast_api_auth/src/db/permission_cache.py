@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import project_settings
+from src.db.redis_cache import invalidation_bus
+from src.models.role import Permissions, Role, UserRole
+from src.utils.cache import InstrumentedTTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class UserAccess:
+    """Эффективные права пользователя.
+
+    Attributes:
+        roles: Имена ролей пользователя
+        mask: Объединение (OR) масок разрешений всех ролей
+
+    """
+
+    roles: tuple[str, ...]
+    mask: int
+
+    @classmethod
+    def from_roles(
+            cls, roles: list[tuple[str, list[Permissions]]]
+        ) -> 'UserAccess':
+        """Вычисляет права по парам (имя роли, разрешения роли)."""
+        mask = 0
+        for _, permissions in roles:
+            mask |= Permissions.to_mask(permissions)
+        return cls(roles=tuple(sorted({name for name, _ in roles})), mask=mask)
+
+
+"""Кеш эффективных прав по id пользователя, общий для запросов воркера."""
+access_cache = InstrumentedTTLCache(
+    maxsize=project_settings.user_cache_maxsize,
+    ttl=project_settings.access_cache_ttl_seconds,
+)
+
+
+async def get_user_access(session: AsyncSession, user_id: UUID) -> UserAccess:
+    """Возвращает права пользователя из кеша или вычисляет их по БД."""
+    access = access_cache.lookup(user_id)
+    if access is None:
+        result = await session.execute(
+            select(Role.name, Role.permissions)
+            .join(UserRole, UserRole.role_id == Role.id)
+            .where(UserRole.user_id == user_id)
+        )
+        access = UserAccess.from_roles(result.all())
+        access_cache.store(user_id, access)
+    return access
+
+
+async def invalidate_access(user_ids: list[UUID]) -> None:
+    """Сбрасывает права пользователей в кешах всех воркеров.
+
+    Идентификаторы передаются одним сообщением через запятую. Если их
+    больше `access_invalidation_max_keys`, кеш сбрасывается целиком.
+    """
+    if len(user_ids) > project_settings.access_invalidation_max_keys:
+        await invalidation_bus.invalidate('p')
+    elif user_ids:
+        await invalidation_bus.invalidate(
+            'p', ','.join(str(user_id) for user_id in user_ids)
+        )
+
+
+def _evict_user(key: str) -> None:
+    """Сбрасывает права пользователей при изменении их ролей."""
+    if key == '*':
+        access_cache.clear()
+        return
+    for user_id in key.split(','):
+        access_cache.pop(UUID(user_id), None)
+
+
+def _evict_role(key: str) -> None:
+    """Сбрасывает все права при изменении роли.
+
+    Обратного индекса роль -> пользователи нет, а изменения ролей редки.
+    """
+    access_cache.clear()
+
+
+def _set_max_age(max_age: float | None) -> None:
+    """Меняет режим кеша при потере или восстановлении канала."""
+    access_cache.max_age = max_age
+    access_cache.clear()
+
+
+invalidation_bus.subscribe('u', _evict_user)
+invalidation_bus.subscribe('p', _evict_user)
+invalidation_bus.subscribe('r', _evict_role)
+invalidation_bus.on_degrade(_set_max_age)
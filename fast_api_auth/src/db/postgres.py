@@ -1,9 +1,19 @@
+import asyncio
+import itertools
+import logging
 import re
+import time
 import uuid
 from typing import AsyncIterator
 
-from sqlalchemy import UUID
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Depends, Request, Response
+from sqlalchemy import UUID, event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
 from sqlalchemy.orm import (
     Mapped,
     declarative_base,
@@ -11,8 +21,23 @@ from sqlalchemy.orm import (
     mapped_column,
     sessionmaker,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from src.core.config import (
+    PostgresSettings,
+    postgres_settings,
+    project_settings,
+)
+from src.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT
+from src.core.profiling import instrument_engine
+from src.db.query_log import query_log
+from src.utils.circuit_breaker import CircuitBreaker
+
+
+logger = logging.getLogger(__name__)
 
-from src.core.config import postgres_settings, project_settings
+"""Cookie, закрепляющая чтение клиента за основной БД после записи."""
+PRIMARY_STICKY_COOKIE = 'pg_primary'
 
 
 class PreBase:
@@ -34,16 +59,337 @@ class PreBase:
 """Базовый класс для всех декларативных моделей."""
 Base = declarative_base(cls=PreBase)
 
+
+def _unique_statement_name() -> str:
+    """Уникальное имя prepared statement для работы через PgBouncer."""
+    return f'__asyncpg_{uuid.uuid4()}__'
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, измеряющий ожидание выдачи соединения.
+
+    Метка `pool` берется из `pool_logging_name` движка.
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        """Выдает соединение, учитывая время ожидания и занятость пула."""
+        name = self._orig_logging_name or 'default'
+        start = time.perf_counter()
+        record = super()._do_get()
+        DB_POOL_CHECKOUT.labels(name).observe(time.perf_counter() - start)
+        DB_POOL_CHECKED_OUT.labels(name).set(self.checkedout())
+        return record
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        """Возвращает соединение в пул."""
+        super()._do_return_conn(record)
+        DB_POOL_CHECKED_OUT.labels(
+            self._orig_logging_name or 'default'
+        ).set(self.checkedout())
+
+
+# Логгер подкласса пула находится вне иерархии `sqlalchemy`, которую
+# SQLAlchemy по умолчанию ограничивает уровнем WARNING.
+logging.getLogger(
+    f'{InstrumentedQueuePool.__module__}.{InstrumentedQueuePool.__name__}'
+).setLevel(logging.WARNING)
+
+
+def create_engine(
+        dsn: str, settings: PostgresSettings, name: str = 'primary'
+    ) -> AsyncEngine:
+    """Создает асинхронный движок с настройками пула из конфигурации.
+
+    В режиме `pgbouncer` кеши prepared statements отключены, а имена
+    statements уникальны: в транзакционном режиме PgBouncer следующая
+    транзакция может попасть на другое серверное соединение.
+
+    Запросы учитываются в журнале медленных запросов, если он включен,
+    и в профилировании, только если оно доступно: иначе события движка
+    не регистрируются вовсе.
+
+    Args:
+        dsn: DSN базы данных
+        settings: Настройки Postgres
+        name: Имя пула в метриках
+
+    Returns:
+        AsyncEngine: Асинхронный движок SQLAlchemy
+
+    """
+    connect_args = {
+        'command_timeout': settings.command_timeout,
+        'statement_cache_size': settings.statement_cache_size,
+        'prepared_statement_cache_size': (
+            settings.prepared_statement_cache_size
+        ),
+    }
+    if settings.pgbouncer:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=_unique_statement_name,
+        )
+    engine = create_async_engine(
+        dsn,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=name,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+        connect_args=connect_args,
+    )
+    if settings.query_log_enabled:
+        query_log.instrument(engine)
+    if project_settings.profiling_available:
+        instrument_engine(engine)
+    return engine
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int) -> None:
+    """Заранее открывает соединения пула.
+
+    Соединения открываются параллельно, поэтому каждое из них новое и
+    после проверки остается в пуле. Больше `pool_size` открывать нет
+    смысла: лишние соединения закрываются при возврате в пул.
+    """
+
+    async def _ping() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+
+    connections = min(connections, engine.pool.size())
+    await asyncio.gather(*(_ping() for _ in range(connections)))
+
+
+def install_breaker(engine: AsyncEngine, breaker: CircuitBreaker) -> None:
+    """Сообщает предохранителю о доступности БД по событиям движка.
+
+    Успехом считается выдача проверенного соединения из пула, отказом -
+    ошибка установки соединения или его разрыв. Ошибки самих запросов и
+    неудачный pre-ping, после которого пул переподключается, на
+    предохранитель не влияют.
+    """
+
+    def on_connect(
+            dialect: any, record: any, cargs: tuple, cparams: dict
+        ) -> any:
+        try:
+            return dialect.connect(*cargs, **cparams)
+        except OSError:
+            breaker.record_failure()
+            raise
+
+    def on_checkout(*args: any) -> None:
+        breaker.record_success()
+
+    def on_error(context: ExceptionContext) -> None:
+        if context.is_pre_ping:
+            return
+        if context.is_disconnect or isinstance(
+            context.original_exception, OSError
+        ):
+            breaker.record_failure()
+
+    event.listen(engine.sync_engine, 'do_connect', on_connect)
+    event.listen(engine.sync_engine, 'checkout', on_checkout)
+    event.listen(engine.sync_engine, 'handle_error', on_error)
+
+
 """Асинхронный движок для подключения к PostgreSQL."""
-engine = create_async_engine(
-    postgres_settings.dsn, echo=project_settings.debug
+engine = create_engine(postgres_settings.dsn, postgres_settings)
+
+"""Предохранитель основной БД: запросы получают 503, пока она недоступна."""
+postgres_breaker = CircuitBreaker(
+    'postgres',
+    failure_threshold=postgres_settings.breaker_failure_threshold,
+    recovery_timeout=postgres_settings.breaker_recovery_timeout,
 )
+install_breaker(engine, postgres_breaker)
 
 """Фабрика асинхронных сессий для работы с базой данных."""
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession)
 
 
 async def get_async_session() -> AsyncIterator[AsyncSession]:
-    """Генератор асинхронных сессий для использования в зав-тях FastAPI."""
+    """Генератор асинхронных сессий для использования в зав-тях FastAPI.
+
+    Raises:
+        CircuitOpenError: 503, если основная БД недоступна
+
+    """
+    postgres_breaker.check()
     async with AsyncSessionLocal() as async_session:
         yield async_session
+
+
+class ReplicaPool:
+    """Набор реплик для чтения с контролем отставания.
+
+    Фоновая задача периодически измеряет отставание каждой реплики и
+    исключает из ротации недоступные и отстающие больше
+    `max_lag_seconds`. Запросы распределяются по здоровым репликам
+    по кругу.
+
+    Attributes:
+        engines: Движки всех реплик
+        healthy: Движки реплик, участвующих в ротации
+
+    """
+
+    _LAG_QUERY = text(
+        'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()'
+        ' THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM'
+        ' now() - pg_last_xact_replay_timestamp()), 0) END'
+    )
+
+    def __init__(
+            self,
+            engines: list[AsyncEngine],
+            max_lag_seconds: float,
+            check_interval: float,
+        ) -> None:
+        self.engines = engines
+        self.healthy = list(engines)
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    def choose(self) -> AsyncEngine | None:
+        """Возвращает следующую здоровую реплику или None."""
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def check(self) -> None:
+        """Обновляет список здоровых реплик."""
+        lags = await asyncio.gather(
+            *(self._lag(engine) for engine in self.engines)
+        )
+        healthy = [
+            engine for engine, lag in zip(self.engines, lags)
+            if lag is not None and lag <= self.max_lag_seconds
+        ]
+        if len(healthy) != len(self.healthy):
+            logger.warning(
+                f'Реплик в ротации: {len(healthy)} из {len(self.engines)}'
+            )
+        self.healthy = healthy
+
+    async def start(self) -> None:
+        """Запускает фоновую проверку реплик."""
+        if self.engines and self._task is None:
+            await self.check()
+            self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self) -> None:
+        """Останавливает проверку и закрывает соединения реплик."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _monitor(self) -> None:
+        """Периодически проверяет реплики."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    async def _lag(self, engine: AsyncEngine) -> float | None:
+        """Возвращает отставание реплики в секундах или None."""
+        try:
+            async with engine.connect() as connection:
+                result = await connection.execute(self._LAG_QUERY)
+                return float(result.scalar_one())
+        except Exception as error:
+            logger.warning(f'Реплика {engine.url.host} недоступна: {error}')
+            return None
+
+
+"""Реплики для чтения, пустой набор если они не настроены."""
+replica_pool = ReplicaPool(
+    [
+        create_engine(dsn, postgres_settings, name=f'replica{index}')
+        for index, dsn in enumerate(postgres_settings.replica_dsns)
+    ],
+    max_lag_seconds=postgres_settings.replica_max_lag_seconds,
+    check_interval=postgres_settings.replica_check_interval,
+)
+
+
+class SessionRouter:
+    """Сессии запроса с маршрутизацией чтения на реплики.
+
+    Запись и чтение после записи выполняются через `primary`. Остальное
+    чтение идет через `reader` на реплику. После записи `pin` закрепляет
+    оставшуюся часть запроса и следующие запросы клиента (через cookie на
+    `replica_sticky_seconds`) за основной БД.
+
+    Attributes:
+        primary: Сессия основной БД
+        pinned: Признак закрепления чтения за основной БД
+
+    """
+
+    def __init__(
+            self,
+            primary: AsyncSession,
+            response: Response | None = None,
+            pinned: bool = False,
+        ) -> None:
+        self.primary = primary
+        self.pinned = pinned
+        self._response = response
+        self._replica: AsyncSession | None = None
+
+    @property
+    def reader(self) -> AsyncSession:
+        """Сессия для чтения: реплика или основная БД."""
+        if self.pinned:
+            return self.primary
+        if self._replica is None:
+            replica_engine = replica_pool.choose()
+            if replica_engine is None:
+                return self.primary
+            self._replica = AsyncSession(replica_engine)
+        return self._replica
+
+    def pin(self) -> None:
+        """Закрепляет чтение за основной БД после записи."""
+        self.pinned = True
+        if self._response is not None and replica_pool.engines:
+            self._response.set_cookie(
+                PRIMARY_STICKY_COOKIE, '1',
+                max_age=postgres_settings.replica_sticky_seconds,
+                httponly=True,
+            )
+
+    async def close(self) -> None:
+        """Закрывает сессию реплики, если она открывалась."""
+        if self._replica is not None:
+            await self._replica.close()
+
+
+async def get_session_router(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+) -> AsyncIterator[SessionRouter]:
+    """Зависимость FastAPI с сессиями основной БД и реплики."""
+    router = SessionRouter(
+        session, response,
+        pinned=PRIMARY_STICKY_COOKIE in request.cookies,
+    )
+    try:
+        yield router
+    finally:
+        await router.close()
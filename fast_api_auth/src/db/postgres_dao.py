@@ -0,0 +1,311 @@
+import base64
+import binascii
+import operator
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator
+
+import orjson
+import sqlalchemy as sa
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.abstract_db import AbstractDAO, Page
+from src.db.postgres import Base
+from src.models.auth_history import AuthHistory
+from src.models.role import Role
+from src.models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class TableSpec:
+    """Описание таблицы, доступной для поиска.
+
+    Attributes:
+        model: Модель SQLAlchemy
+        filters: Колонки, по которым разрешена фильтрация
+        sorts: Индексированные колонки, по которым разрешена сортировка
+        columns: Возвращаемые колонки, по умолчанию все
+
+    """
+
+    model: type[Base]
+    filters: frozenset[str]
+    sorts: frozenset[str]
+    columns: tuple[str, ...] | None = None
+
+    @property
+    def table(self) -> sa.Table:
+        """Таблица модели."""
+        return self.model.__table__
+
+    def selected_columns(self) -> list[sa.Column]:
+        """Колонки, возвращаемые поиском."""
+        if self.columns is None:
+            return list(self.table.columns)
+        return [self.table.c[name] for name in self.columns]
+
+
+"""Таблицы, доступные через PostgresDAO, и их разрешенные поля."""
+TABLES: dict[str, TableSpec] = {
+    'role': TableSpec(
+        Role, filters=frozenset({'name'}), sorts=frozenset({'id'})
+    ),
+    'user': TableSpec(
+        User,
+        filters=frozenset({'email', 'is_active', 'is_superuser',
+                           'is_verified'}),
+        sorts=frozenset({'id', 'email'}),
+        columns=('id', 'email', 'is_active', 'is_superuser', 'is_verified'),
+    ),
+    'auth_history': TableSpec(
+        AuthHistory,
+        filters=frozenset({'user_id', 'timestamp'}),
+        sorts=frozenset({'id', 'timestamp'}),
+    ),
+}
+
+
+@lru_cache(maxsize=64)
+def _type_adapter(python_type: type) -> TypeAdapter:
+    """TypeAdapter для типа колонки, создается один раз на тип."""
+    return TypeAdapter(python_type)
+
+
+def json_default(value: any) -> str:
+    """Сериализация значений строк, которые orjson не знает.
+
+    asyncpg возвращает UUID подклассом `uuid.UUID`, а orjson
+    сериализует только сам `uuid.UUID`.
+
+    Raises:
+        TypeError: Если тип значения не поддерживается
+
+    """
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f'Type is not JSON serializable: {type(value)!r}')
+
+
+_RANGE_OPERATORS = {
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+}
+
+
+class PostgresDAO(AbstractDAO):
+    """DAO поверх Postgres с keyset-пагинацией.
+
+    Страница выбирается условием `(колонки сортировки, id) > значения
+    последней строки` вместо OFFSET, поэтому глубокие страницы стоят
+    столько же, сколько первая, если есть индекс по колонкам сортировки.
+    Курсор непрозрачен для клиента: это base64 от полей сортировки и
+    значений последней строки. Строки возвращаются словарями без
+    создания ORM-объектов, а `stream` читает результат серверным
+    курсором порциями, так что память не растет с размером таблицы.
+
+    Note:
+        Фильтры и сортировки проверяются по белым спискам `TABLES`.
+        Все ошибки входных данных приводят к ValueError.
+
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get(self, table: str, id_obj: str) -> dict[str, any] | None:
+        """Получение объекта по ID из указанной таблицы."""
+        spec = self._spec(table)
+        id_column = spec.table.c.id
+        result = await self.session.execute(
+            sa.select(*spec.selected_columns()).where(
+                id_column == self._coerce(id_column, id_obj)
+            )
+        )
+        row = result.first()
+        return None if row is None else dict(row._mapping)
+
+    async def search(
+        self,
+        table: str,
+        cursor: str | None = None,
+        limit: int = 50,
+        sort: list[dict[str, str]] | None = None,
+        filters: dict[str, any] | None = None,
+    ) -> Page:
+        """Поиск объектов в таблице с пагинацией по курсору.
+
+        Args:
+            table: Имя таблицы из `TABLES`
+            cursor: Курсор из предыдущей страницы
+            limit: Размер страницы
+            sort: Сортировка вида [{'field': 'name', 'order': 'asc'}]
+            filters: Равенство полю, вхождение в список значений или
+                диапазон вида {'gte': a, 'lt': b}
+
+        Raises:
+            ValueError: Если таблица, поле, курсор или значение неверны
+
+        """
+        spec = self._spec(table)
+        keys, descending = self._sort_keys(spec, sort)
+        query = self._query(spec, keys, descending, filters)
+        if cursor is not None:
+            values = self._decode_cursor(keys, cursor)
+            row_keys = sa.tuple_(*keys)
+            row_values = sa.tuple_(*(
+                sa.literal(value, column.type)
+                for column, value in zip(keys, values)
+            ))
+            query = query.where(
+                row_keys < row_values if descending else row_keys > row_values
+            )
+
+        result = await self.session.execute(query.limit(limit + 1))
+        rows = result.all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(keys, rows[-1])
+        return Page(
+            items=[dict(row._mapping) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    async def stream(
+        self,
+        table: str,
+        sort: list[dict[str, str]] | None = None,
+        filters: dict[str, any] | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict[str, any]]:
+        """Потоковое чтение всех найденных объектов серверным курсором.
+
+        Raises:
+            ValueError: Если таблица, поле или значение неверны
+
+        """
+        spec = self._spec(table)
+        keys, descending = self._sort_keys(spec, sort)
+        query = self._query(spec, keys, descending, filters)
+        result = await self.session.stream(
+            query.execution_options(yield_per=batch_size)
+        )
+        try:
+            async for row in result:
+                yield dict(row._mapping)
+        finally:
+            # Закрывает серверный курсор, если чтение прервано раньше
+            await result.close()
+
+    @staticmethod
+    def _spec(table: str) -> TableSpec:
+        """Описание таблицы из белого списка."""
+        try:
+            return TABLES[table]
+        except KeyError:
+            raise ValueError(f'Unknown table: {table}') from None
+
+    @staticmethod
+    def _sort_keys(
+            spec: TableSpec, sort: list[dict[str, str]] | None
+        ) -> tuple[list[sa.Column], bool]:
+        """Колонки keyset-сортировки, всегда заканчивающиеся на id.
+
+        Returns:
+            tuple: Колонки и признак сортировки по убыванию
+
+        """
+        fields = []
+        orders = set()
+        for item in sort or ():
+            field = item.get('field')
+            if field not in spec.sorts:
+                raise ValueError(f'Sorting by {field!r} is not allowed')
+            order = item.get('order', 'asc')
+            if order not in ('asc', 'desc'):
+                raise ValueError(f'Unknown sort order: {order!r}')
+            fields.append(field)
+            orders.add(order)
+        if len(orders) > 1:
+            raise ValueError('Mixed sort orders are not supported')
+        if 'id' not in fields:
+            fields.append('id')
+        return [spec.table.c[field] for field in fields], orders == {'desc'}
+
+    def _query(
+            self,
+            spec: TableSpec,
+            keys: list[sa.Column],
+            descending: bool,
+            filters: dict[str, any] | None,
+        ) -> sa.Select:
+        """Запрос с фильтрами и сортировкой, без пагинации."""
+        query = sa.select(*spec.selected_columns()).order_by(*(
+            key.desc() if descending else key.asc() for key in keys
+        ))
+        for field, value in (filters or {}).items():
+            if field not in spec.filters:
+                raise ValueError(f'Filtering by {field!r} is not allowed')
+            column = spec.table.c[field]
+            if isinstance(value, dict):
+                for name, bound in value.items():
+                    if name not in _RANGE_OPERATORS:
+                        raise ValueError(f'Unknown range operator: {name!r}')
+                    query = query.where(_RANGE_OPERATORS[name](
+                        column, self._coerce(column, bound)
+                    ))
+            elif isinstance(value, (list, tuple, set)):
+                query = query.where(column == sa.any_(sa.bindparam(
+                    None,
+                    [self._coerce(column, item) for item in value],
+                    type_=sa.ARRAY(column.type),
+                )))
+            else:
+                query = query.where(column == self._coerce(column, value))
+        return query
+
+    @staticmethod
+    def _coerce(column: sa.Column, value: any) -> any:
+        """Приводит значение из запроса или курсора к типу колонки."""
+        try:
+            adapter = _type_adapter(column.type.python_type)
+            return adapter.validate_python(value)
+        except (ValidationError, NotImplementedError) as error:
+            raise ValueError(
+                f'Invalid value for {column.name!r}: {value!r}'
+            ) from error
+
+    @staticmethod
+    def _encode_cursor(keys: list[sa.Column], row: sa.Row) -> str:
+        """Кодирует поля сортировки и значения последней строки."""
+        mapping = row._mapping
+        data = [
+            [key.name for key in keys],
+            [mapping[key.name] for key in keys],
+        ]
+        body = orjson.dumps(data, default=json_default)
+        return base64.urlsafe_b64encode(body).decode().rstrip('=')
+
+    def _decode_cursor(self, keys: list[sa.Column], cursor: str) -> list[any]:
+        """Декодирует курсор, проверяя, что он выдан для той же сортировки.
+
+        Raises:
+            ValueError: Если курсор поврежден или от другой сортировки
+
+        """
+        try:
+            fields, values = orjson.loads(
+                base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            )
+        except (binascii.Error, orjson.JSONDecodeError, TypeError,
+                ValueError):
+            raise ValueError('Invalid cursor') from None
+        if fields != [key.name for key in keys] or len(values) != len(keys):
+            raise ValueError('Cursor does not match the sort order')
+        return [
+            self._coerce(key, value) for key, value in zip(keys, values)
+        ]
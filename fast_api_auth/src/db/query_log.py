@@ -0,0 +1,245 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.config import postgres_settings
+
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r'\$\d+|%\(\w+\)s')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROW_LIST = re.compile(r'\(\?\)(?:\s*,\s*\(\?\))+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Приводит SQL к виду без значений для группировки запросов.
+
+    Параметры и литералы заменяются на `?`, списки значений и строки
+    многострочного INSERT сворачиваются в `(?)`, поэтому `IN` разной длины
+    и пакеты разного размера попадают в одну группу.
+    """
+    statement = _WHITESPACE.sub(' ', statement).strip()
+    statement = _PLACEHOLDER.sub('?', statement)
+    statement = _LITERAL.sub('?', statement)
+    statement = _VALUE_LIST.sub('(?)', statement)
+    return _ROW_LIST.sub('(?)', statement)
+
+
+class RequestQueries:
+    """Запросы к БД, выполненные в рамках одного HTTP-запроса.
+
+    Attributes:
+        scope: ASGI scope запроса, маршрут берется из него
+        count: Количество SQL-запросов
+        statements: Количество запросов по отпечатку
+
+    """
+
+    __slots__ = ('scope', 'count', 'statements')
+
+    def __init__(self, scope: Scope) -> None:
+        self.scope = scope
+        self.count = 0
+        self.statements: Counter[str] = Counter()
+
+    @property
+    def route(self) -> str:
+        """Метод и шаблон маршрута, например `GET /auth/v1/users/{id}`."""
+        route = self.scope.get('route')
+        path = getattr(route, 'path', self.scope['path'])
+        return f'{self.scope["method"]} {path}'
+
+
+_current_request: ContextVar[RequestQueries | None] = ContextVar(
+    'query_log_request', default=None
+)
+
+
+class QueryLog:
+    """Журнал медленных запросов и статистика SQL по отпечаткам.
+
+    Подписывается на `before/after_cursor_execute` движка и для каждого
+    запроса:
+    - добавляет его длительность к статистике отпечатка;
+    - пишет в лог запросы дольше `slow_threshold` вместе с маршрутом;
+    - считает запросы текущего HTTP-запроса, чтобы `QueryBudgetMiddleware`
+      предупредил о превышении `request_budget` (типичный признак N+1).
+
+    Attributes:
+        slow_threshold: Порог медленного запроса в секундах
+        request_budget: Допустимое число SQL-запросов на HTTP-запрос
+        max_fingerprints: Максимальное число отпечатков в статистике
+        statements: Отпечаток -> [количество, суммарное время, максимум]
+        slow: Количество медленных запросов
+        over_budget: Количество HTTP-запросов с превышением бюджета
+
+    Note:
+        Статистика собирается отдельно в каждом воркере. Отпечатки сверх
+        `max_fingerprints` учитываются в группе `<other>`.
+
+    """
+
+    OTHER = '<other>'
+
+    def __init__(
+            self,
+            slow_threshold: float,
+            request_budget: int,
+            max_fingerprints: int,
+        ) -> None:
+        self.slow_threshold = slow_threshold
+        self.request_budget = request_budget
+        self.max_fingerprints = max_fingerprints
+        self.statements: dict[str, list[float]] = {}
+        self.slow = 0
+        self.over_budget = 0
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Подписывает журнал на события движка."""
+        event.listen(
+            engine.sync_engine, 'before_cursor_execute', self._before_execute
+        )
+        event.listen(
+            engine.sync_engine, 'after_cursor_execute', self._after_execute
+        )
+
+    def top(self, limit: int, sort: str = 'total') -> list[dict[str, any]]:
+        """Возвращает самые тяжелые отпечатки.
+
+        Args:
+            limit: Количество отпечатков
+            sort: Поле сортировки: `total`, `count`, `mean` или `max`
+
+        """
+        rows = [
+            {
+                'fingerprint': statement,
+                'count': int(count),
+                'total_ms': total * 1000,
+                'mean_ms': total * 1000 / count,
+                'max_ms': longest * 1000,
+            }
+            for statement, (count, total, longest) in self.statements.items()
+        ]
+        key = 'count' if sort == 'count' else f'{sort}_ms'
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        """Очищает статистику отпечатков."""
+        self.statements = {}
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает счетчики журнала."""
+        return {
+            'fingerprints': len(self.statements),
+            'slow': self.slow,
+            'over_budget': self.over_budget,
+        }
+
+    def check_budget(self, request: RequestQueries) -> None:
+        """Предупреждает, если HTTP-запрос превысил бюджет SQL-запросов."""
+        if request.count <= self.request_budget:
+            return
+        self.over_budget += 1
+        statement, repeats = request.statements.most_common(1)[0]
+        logger.warning(
+            f'{request.route} выполнил {request.count} SQL-запросов '
+            f'(бюджет {self.request_budget}), чаще всего {repeats} раз: '
+            f'{statement[:500]}'
+        )
+
+    def _before_execute(
+            self,
+            connection: any,
+            cursor: any,
+            statement: str,
+            parameters: any,
+            context: any,
+            executemany: bool,
+        ) -> None:
+        """Запоминает время начала запроса."""
+        context.query_log_start = time.perf_counter()
+
+    def _after_execute(
+            self,
+            connection: any,
+            cursor: any,
+            statement: str,
+            parameters: any,
+            context: any,
+            executemany: bool,
+        ) -> None:
+        """Учитывает выполненный запрос."""
+        elapsed = time.perf_counter() - context.query_log_start
+        key = fingerprint(statement)
+        entry = self.statements.get(key)
+        if entry is None:
+            if len(self.statements) >= self.max_fingerprints:
+                key = self.OTHER
+                entry = self.statements.get(key)
+            if entry is None:
+                entry = self.statements[key] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+        request = _current_request.get()
+        if request is not None:
+            request.count += 1
+            request.statements[key] += 1
+        if elapsed >= self.slow_threshold:
+            self.slow += 1
+            route = 'вне запроса' if request is None else request.route
+            logger.warning(
+                f'Медленный запрос {elapsed * 1000:.1f} мс ({route}): '
+                f'{statement[:1000]}'
+            )
+
+
+class QueryBudgetMiddleware:
+    """ASGI middleware, связывающее SQL-запросы с HTTP-запросом.
+
+    Attributes:
+        query_log: Журнал, проверяющий бюджет по завершении запроса
+
+    """
+
+    def __init__(self, app: ASGIApp, query_log: QueryLog) -> None:
+        self.app = app
+        self.query_log = query_log
+
+    async def __call__(
+            self, scope: Scope, receive: Receive, send: Send
+        ) -> None:
+        """Выполняет запрос и проверяет число SQL-запросов в нем."""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        request = RequestQueries(scope)
+        token = _current_request.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_request.reset(token)
+            self.query_log.check_budget(request)
+
+
+"""Журнал SQL-запросов воркера, подключается к движкам в create_engine."""
+query_log = QueryLog(
+    slow_threshold=postgres_settings.slow_query_threshold_ms / 1000,
+    request_budget=postgres_settings.query_budget_per_request,
+    max_fingerprints=postgres_settings.query_log_max_fingerprints,
+)
@@ -1,12 +1,31 @@
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
+from typing import Callable
 
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
+from redis import exceptions as redis_exceptions
+from redis.asyncio.client import Pipeline
 from redis.exceptions import ConnectionError as RedisError
 
-from src.core.config import RedisSettings
+from src.core.config import RedisSettings, redis_settings
+from src.core.metrics import REDIS_COMMAND_DURATION
+from src.core.profiling import record
 from src.utils.backoff import backoff
+from src.utils.circuit_breaker import CircuitBreaker
+
+
+logger = logging.getLogger(__name__)
+
+"""Ошибки, означающие недоступность Redis, а не ошибку команды."""
+CONNECTION_ERRORS = (
+    redis_exceptions.ConnectionError,
+    redis_exceptions.TimeoutError,
+    OSError,
+)
 
 
 class CacheInterface(ABC):
@@ -41,24 +60,121 @@ class RedisCache(CacheInterface):
 
     async def close(self) -> None:
         """Завершает работу с Redis, освобождает соединения."""
-        await self.redis_client.close()
+        await self.redis_client.aclose()
+
+
+def _record_call(
+        breaker: CircuitBreaker | None,
+        command: str,
+        start: float,
+        available: bool,
+    ) -> None:
+    """Учитывает длительность команды и доступность Redis."""
+    elapsed = time.perf_counter() - start
+    REDIS_COMMAND_DURATION.labels(command).observe(elapsed)
+    record('redis', elapsed)
+    if breaker is None:
+        return
+    if available:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+
+
+class BreakerPipeline(Pipeline):
+    """Pipeline, сообщающий предохранителю результат выполнения."""
+
+    breaker: CircuitBreaker | None = None
+
+    async def execute(self, raise_on_error: bool = True) -> list[any]:
+        """Выполняет накопленные команды одним запросом."""
+        start = time.perf_counter()
+        try:
+            result = await super().execute(raise_on_error)
+        except CONNECTION_ERRORS:
+            _record_call(self.breaker, 'PIPELINE', start, available=False)
+            raise
+        except redis_exceptions.RedisError:
+            _record_call(self.breaker, 'PIPELINE', start, available=True)
+            raise
+        _record_call(self.breaker, 'PIPELINE', start, available=True)
+        return result
+
+
+class BreakerRedis(aioredis.Redis):
+    """Клиент Redis с предохранителем и метриками команд.
+
+    Ошибки подключения и таймауты команд считаются отказами, а любой
+    ответ сервера, в том числе ошибка команды, - успехом. Длительность
+    каждой команды попадает в гистограмму с меткой имени команды.
+
+    Attributes:
+        breaker: Предохранитель Redis
+
+    """
+
+    breaker: CircuitBreaker | None = None
+
+    async def execute_command(self, *args: any, **options: any) -> any:
+        """Выполняет команду и учитывает ее результат в предохранителе."""
+        command = str(args[0]).upper()
+        start = time.perf_counter()
+        try:
+            result = await super().execute_command(*args, **options)
+        except CONNECTION_ERRORS:
+            _record_call(self.breaker, command, start, available=False)
+            raise
+        except redis_exceptions.RedisError:
+            _record_call(self.breaker, command, start, available=True)
+            raise
+        _record_call(self.breaker, command, start, available=True)
+        return result
+
+    def pipeline(
+            self, transaction: bool = True, shard_hint: str | None = None
+        ) -> BreakerPipeline:
+        """Создает pipeline с тем же предохранителем."""
+        pipe = BreakerPipeline(
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint,
+        )
+        pipe.breaker = self.breaker
+        return pipe
 
 
 class RedisClientFactory:
     """Фабрика для создания клиента Redis."""
 
     @staticmethod
-    async def create(redis_dsn: str) -> aioredis.Redis:
-        """Создает новое подключение к Redis.
+    def create(
+            settings: RedisSettings, breaker: CircuitBreaker | None = None
+        ) -> aioredis.Redis:
+        """Создает клиент Redis поверх собственного пула соединений.
+
+        Клиент владеет пулом: закрытие клиента закрывает и все соединения
+        пула. Соединения открываются лениво, при первой команде.
 
         Args:
-            redis_dsn: DSN для подключения к Redis в формате redis://...
+            settings: Настройки Redis (DSN и параметры пула)
+            breaker: Предохранитель, получающий результаты команд
 
         Returns:
             Асинхронный клиент Redis
 
         """
-        return await aioredis.from_url(redis_dsn)
+        pool = aioredis.ConnectionPool.from_url(
+            settings.dsn,
+            max_connections=settings.max_connections,
+            health_check_interval=settings.health_check_interval,
+            socket_timeout=settings.socket_timeout,
+            socket_connect_timeout=settings.socket_connect_timeout,
+            socket_keepalive=True,
+        )
+        client = BreakerRedis.from_pool(pool)
+        client.breaker = breaker
+        return client
 
 
 class RedisCacheManager:
@@ -66,13 +182,19 @@ class RedisCacheManager:
 
     Attributes:
         settings: Конфигурационные настройки приложения
+        breaker: Предохранитель запросов к Redis
         redis_client: Подключение к Redis (инициализируется при вызове setup)
         cache: Реализация интерфейса кеширования
 
     """
 
-    def __init__(self, settings: RedisSettings) -> None:
+    def __init__(
+            self,
+            settings: RedisSettings,
+            breaker: CircuitBreaker | None = None,
+        ) -> None:
         self.settings = settings
+        self.breaker = breaker
         self.redis_client: aioredis.Redis | None = None
         self.cache: CacheInterface | None = None
 
@@ -84,9 +206,10 @@ class RedisCacheManager:
             RedisError: При невозможности установить соединение после повторов
 
         """
-        self.redis_client = await RedisClientFactory.create(
-            self.settings.dsn
+        self.redis_client = RedisClientFactory.create(
+            self.settings, self.breaker
         )
+        await self.redis_client.ping()
         self.cache = RedisCache(self.redis_client)
         await self.cache.connect()
 
@@ -98,3 +221,181 @@ class RedisCacheManager:
         """
         if self.cache:
             await self.cache.close()
+        self.redis_client = None
+        self.cache = None
+
+
+class CacheInvalidationBus:
+    """Шина инвалидации локальных кешей воркеров через Redis pub/sub.
+
+    Сообщение имеет вид `<вид>:<ключ>`, например `u:<user_id>` или
+    `r:*`. Каждый воркер подписывается на канал и передает ключ
+    обработчикам, зарегистрированным для вида. Пока канал недоступен,
+    локальные кеши переводятся на короткий TTL.
+
+    Attributes:
+        manager: Менеджер подключения к Redis
+        settings: Настройки Redis (канал, короткий TTL, паузы)
+        connected: Признак активной подписки на канал
+
+    """
+
+    def __init__(
+            self, manager: RedisCacheManager, settings: RedisSettings
+        ) -> None:
+        self.manager = manager
+        self.settings = settings
+        self.connected = False
+        self._handlers: dict[str, list[Callable[[str], None]]] = {}
+        self._degrade_handlers: list[Callable[[float | None], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, kind: str, handler: Callable[[str], None]) -> None:
+        """Регистрирует обработчик сообщений указанного вида."""
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def on_degrade(self, handler: Callable[[float | None], None]) -> None:
+        """Регистрирует обработчик смены режима кеша.
+
+        Обработчик получает короткий TTL при потере канала и None при
+        его восстановлении.
+        """
+        self._degrade_handlers.append(handler)
+
+    async def invalidate(self, kind: str, key: str = '*') -> None:
+        """Инвалидирует ключ локально и рассылает сообщение остальным.
+
+        Ошибка публикации не прерывает запрос: остальные воркеры
+        догонят изменения по TTL.
+        """
+        self._dispatch(kind, key)
+        client = self.manager.redis_client
+        if client is None:
+            return
+        try:
+            await client.publish(
+                self.settings.invalidation_channel, f'{kind}:{key}'
+            )
+        except (redis_exceptions.RedisError, OSError) as error:
+            logger.warning(f'Не удалось опубликовать инвалидацию: {error}')
+
+    async def start(self) -> None:
+        """Запускает фоновую подписку на канал инвалидации."""
+        if self._task is None:
+            self._set_connected(False)
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Останавливает подписку."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _listen(self) -> None:
+        """Слушает канал, переподключаясь с растущей паузой.
+
+        Пауза растет только при неудачных подключениях подряд: после
+        успешной подписки она начинается заново. Любая ошибка, кроме
+        отмены задачи, ведет к переподключению, а не к остановке шины.
+        """
+        delay = self.settings.invalidation_reconnect_delay
+        while True:
+            try:
+                await self._consume()
+            except Exception as error:
+                if self.connected:
+                    delay = self.settings.invalidation_reconnect_delay
+                logger.warning(
+                    f'Канал инвалидации недоступен: {error}. '
+                    f'Повторное подключение через {delay} секунд',
+                    exc_info=not isinstance(
+                        error, (redis_exceptions.RedisError, OSError)
+                    ),
+                )
+            self._set_connected(False)
+            await asyncio.sleep(delay)
+            delay = min(
+                delay * 2, self.settings.invalidation_reconnect_max_delay
+            )
+
+    async def _consume(self) -> None:
+        """Читает сообщения канала до разрыва соединения."""
+        async with self.manager.redis_client.pubsub(
+            ignore_subscribe_messages=True
+        ) as pubsub:
+            await pubsub.subscribe(self.settings.invalidation_channel)
+            self._set_connected(True)
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message is None:
+                    continue
+                try:
+                    data = message['data'].decode()
+                except UnicodeDecodeError:
+                    logger.warning(
+                        f'Пропущено сообщение инвалидации не в UTF-8: '
+                        f'{message["data"][:100]!r}'
+                    )
+                    continue
+                kind, _, key = data.partition(':')
+                self._dispatch(kind, key)
+
+    def _dispatch(self, kind: str, key: str) -> None:
+        """Передает ключ обработчикам вида.
+
+        Ошибка обработчика, например некорректный ключ в сообщении,
+        логируется и не мешает остальным обработчикам и подписке.
+        """
+        for handler in self._handlers.get(kind, ()):
+            try:
+                handler(key)
+            except Exception:
+                logger.exception(
+                    f'Ошибка обработки инвалидации {kind}:{key[:100]}'
+                )
+
+    def _set_connected(self, connected: bool) -> None:
+        """Переключает локальные кеши между обычным и коротким TTL."""
+        if connected == self.connected and self._task is not None:
+            return
+        self.connected = connected
+        max_age = (
+            None if connected else self.settings.invalidation_fallback_ttl
+        )
+        for handler in self._degrade_handlers:
+            handler(max_age)
+
+
+"""Предохранитель Redis: запросы получают 503, пока Redis недоступен."""
+redis_breaker = CircuitBreaker(
+    'redis',
+    failure_threshold=redis_settings.breaker_failure_threshold,
+    recovery_timeout=redis_settings.breaker_recovery_timeout,
+)
+
+"""Единый на время жизни приложения менеджер подключения к Redis."""
+redis_cache_manager = RedisCacheManager(redis_settings, redis_breaker)
+
+"""Шина инвалидации локальных кешей между воркерами."""
+invalidation_bus = CacheInvalidationBus(redis_cache_manager, redis_settings)
+
+
+async def get_redis_client() -> aioredis.Redis:
+    """Зависимость FastAPI, возвращающая общий клиент Redis.
+
+    Raises:
+        RuntimeError: Если подключение не инициализировано в lifespan
+        CircuitOpenError: 503, если Redis недоступен
+
+    """
+    if redis_cache_manager.redis_client is None:
+        raise RuntimeError('Redis client is not initialized')
+    redis_breaker.check()
+    return redis_cache_manager.redis_client
@@ -0,0 +1,122 @@
+import asyncio
+from uuid import UUID
+
+from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.core.config import project_settings
+from src.db.redis_cache import invalidation_bus
+from src.models.user import User
+from src.utils.cache import InstrumentedTTLCache
+
+
+"""Кеш снимков пользователей по id, общий для всех запросов воркера."""
+user_cache = InstrumentedTTLCache(
+    maxsize=project_settings.user_cache_maxsize,
+    ttl=project_settings.user_cache_ttl_seconds,
+)
+
+_USER_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+def _snapshot(user: User) -> dict[str, any]:
+    """Сохраняет значения колонок пользователя без привязки к сессии."""
+    return {key: getattr(user, key) for key in _USER_COLUMNS}
+
+
+async def invalidate_user(user_id: UUID) -> None:
+    """Удаляет пользователя из кешей всех воркеров."""
+    await invalidation_bus.invalidate('u', str(user_id))
+
+
+def _evict_user(key: str) -> None:
+    """Обрабатывает сообщение инвалидации пользователя."""
+    if key == '*':
+        user_cache.clear()
+    else:
+        user_cache.pop(UUID(key), None)
+
+
+def _set_max_age(max_age: float | None) -> None:
+    """Меняет режим кеша при потере или восстановлении канала.
+
+    Пропущенные за время разрыва сообщения не восстановить, поэтому кеш
+    очищается при каждой смене режима.
+    """
+    user_cache.max_age = max_age
+    user_cache.clear()
+
+
+invalidation_bus.subscribe('u', _evict_user)
+invalidation_bus.on_degrade(_set_max_age)
+
+
+class CachedSQLAlchemyUserDatabase(SQLAlchemyUserDatabase[User, UUID]):
+    """Адаптер БД пользователей с in-process кешем для `get` по id.
+
+    В кеше хранятся снимки колонок, а не ORM-объекты: при попадании
+    снимок присоединяется к сессии запроса через `merge(load=False)`,
+    без обращения к БД. Параллельные промахи по одному id ожидают
+    единственный запрос к Postgres, который идет в `read_session`
+    (реплику), а при ее отставании в основную сессию.
+    """
+
+    _inflight: dict[UUID, asyncio.Future] = {}
+
+    def __init__(
+            self,
+            session: AsyncSession,
+            cache: InstrumentedTTLCache = user_cache,
+            read_session: AsyncSession | None = None,
+        ) -> None:
+        super().__init__(session, User)
+        self.cache = cache
+        self.read_session = read_session or session
+
+    async def get(self, id: UUID) -> User | None:  # noqa: A002
+        """Получает пользователя по id, используя кеш."""
+        state = self.cache.lookup(id)
+        if state is None:
+            state = await self._load(id)
+            if state is None:
+                return None
+        user = User(**state)
+        make_transient_to_detached(user)
+        return await self.session.merge(user, load=False)
+
+    async def _load(self, id: UUID) -> dict[str, any] | None:  # noqa: A002
+        """Загружает снимок пользователя из БД, объединяя промахи."""
+        inflight = self._inflight.get(id)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[id] = future
+        try:
+            user = await self._select(id, self.read_session)
+            if user is None and self.read_session is not self.session:
+                # Реплика может еще не получить только что созданного
+                user = await self._select(id, self.session)
+            state = None if user is None else _snapshot(user)
+            if state is not None:
+                self.cache.store(id, state)
+            future.set_result(state)
+        except Exception as error:
+            future.set_exception(error)
+            # Ошибку получает вызывающий код; ожидающих может не быть
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[id]
+        return state
+
+    async def _select(
+            self, id: UUID, session: AsyncSession  # noqa: A002
+        ) -> User | None:
+        """Выбирает пользователя по id в указанной сессии."""
+        result = await session.execute(select(User).where(User.id == id))
+        return result.unique().scalar_one_or_none()
@@ -1,25 +1,42 @@
-from typing import List
+from typing import Awaitable, Callable
 
-from fastapi import HTTPException, Request, status
-from fastapi_auth.src.utils.tokenuser import decode_jwt
+from fastapi import Depends, HTTPException, status
 
+from src.core.principal import Principal, current_principal
+from src.models.role import Permissions
 
-class UnusualException(HTTPException):
-    def __init__(self, status_code: int, message: str, code: str, target: str):
-        super().__init__(status_code=status_code, detail=message)
-        self.code = code
-        self.target = target
 
+def role_verification(
+        *permissions: Permissions,
+        any_of: bool = False,
+    ) -> Callable[..., Awaitable[Principal]]:
+    """Фабрика зависимостей, проверяющих разрешения пользователя.
 
-def role_verification(allowed_roles: List[str]):
-    def verify_roles(request: Request = Request):
-        access_token: dict = decode_jwt(request.cookies.get("access"))
-        if access_token.get("role") not in allowed_roles:
-            raise UnusualException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                message="Ошибка доступа",
-                code="Access denied",
-                target="role",
-            )
+    Маска требуемых разрешений вычисляется один раз при создании
+    зависимости, а проверка сводится к `required_mask & user_mask` по
+    claim `pm` access token, без обращения к БД и Redis.
+    Суперпользователь проходит любую проверку.
 
-    return verify_roles
+    Args:
+        permissions: Требуемые разрешения
+        any_of: Достаточно любого из разрешений вместо всех
+
+    Returns:
+        Зависимость FastAPI, возвращающая Principal
+
+    """
+    required_mask = Permissions.to_mask(permissions)
+
+    async def verify_permissions(
+        principal: Principal = Depends(current_principal),
+    ) -> Principal:
+        if principal.is_superuser or principal.has_permissions(
+            required_mask, any_of
+        ):
+            return principal
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Недостаточно прав',
+        )
+
+    return verify_permissions
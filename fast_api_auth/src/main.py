@@ -2,12 +2,20 @@ from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
 from fastapi import FastAPI
-from fastapi.responses import ORJSONResponse
 
 from src.api.routers import main_router
-from src.core.config import project_settings, redis_settings
+from src.core.config import postgres_settings, project_settings
+from src.core.metrics import PrometheusMiddleware
+from src.core.profiling import ProfiledORJSONResponse, ProfilingMiddleware
+from src.core.revocation import revocation_list
+from src.core.user_core import password_helper
 from src.db.init_postgres import create_first_superuser
-from src.db.redis_cache import RedisCacheManager
+from src.db.partitions import auth_history_partitions
+from src.db.postgres import engine, replica_pool, warm_up_pool
+from src.db.query_log import QueryBudgetMiddleware, query_log
+from src.db.redis_cache import invalidation_bus, redis_cache_manager
+from src.services.auth_history_service import auth_history_writer
+from src.services.metrics_service import metrics_service
 
 
 @asynccontextmanager
@@ -16,8 +24,16 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     Управляет инициализацией и освобождением ресурсов при запуске и
     остановке приложения:
+    - Заранее открывает соединения пула Postgres
+    - Запускает контроль отставания реплик для чтения
+    - Инициализирует общий пул подключений к Redis
+    - Подписывает воркер на канал инвалидации локальных кешей
+    - Загружает фильтр отозванных access token
+    - Запускает пул процессов для хеширования паролей
+    - Обслуживает месячные партиции истории входов
+    - Запускает пакетную запись истории входов
+    - Запускает перенос счетчиков компонентов в метрики
     - Создает первого суперпользователя при старте
-    - Инициализирует подключение к Redis
     - Корректно закрывает соединения при завершении
 
     Yields:
@@ -28,25 +44,51 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         блок finally выполняется при остановке приложения.
 
     """
-    redis_cache_manager = RedisCacheManager(redis_settings)
     try:
-        await create_first_superuser()
+        await warm_up_pool(engine, postgres_settings.warmup_connections)
+        await replica_pool.start()
         await redis_cache_manager.setup()
+        await invalidation_bus.start()
+        await revocation_list.start()
+        password_helper.start()
+        await auth_history_partitions.start()
+        await auth_history_writer.start()
+        await metrics_service.start()
+        await create_first_superuser()
 
         yield
 
     finally:
+        await metrics_service.stop()
+        await auth_history_writer.stop()
+        await auth_history_partitions.stop()
+        password_helper.stop()
+        await revocation_list.stop()
+        await invalidation_bus.stop()
         await redis_cache_manager.tear_down()
+        await replica_pool.stop()
+        await engine.dispose()
 
 
 app = FastAPI(
     title=project_settings.project_auth_name,
     docs_url='/auth/openapi',
     openapi_url='/auth/openapi.json',
-    default_response_class=ORJSONResponse,
+    default_response_class=ProfiledORJSONResponse,
     summary=project_settings.project_auth_summary,
     openapi_tags=project_settings.project_auth_tags,
     lifespan=lifespan,
 )
 
+app.add_middleware(PrometheusMiddleware)
+if postgres_settings.query_log_enabled:
+    app.add_middleware(QueryBudgetMiddleware, query_log=query_log)
+if project_settings.profiling_available:
+    app.add_middleware(
+        ProfilingMiddleware,
+        always=project_settings.profiling_enabled,
+        secret=project_settings.profiling_secret,
+        dump_dir=project_settings.profiling_dump_dir,
+        sample_rate=project_settings.profiling_sample_rate,
+    )
 app.include_router(main_router)
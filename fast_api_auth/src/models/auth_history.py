@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import DDL, ForeignKey, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.postgres import Base
@@ -10,6 +10,12 @@ from src.db.postgres import Base
 class AuthHistory(Base):
     """Таблица истории аутентификации пользователя."""
 
+    # Секционирование по месяцам требует timestamp в первичном ключе
+    __table_args__ = (
+        Index('ix_auth_history_user_id_timestamp', 'user_id', 'timestamp'),
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
+
     user_id: Mapped[UUID] = mapped_column(
         ForeignKey('user.id', ondelete='CASCADE'),
         primary_key=True,
@@ -17,7 +23,18 @@ class AuthHistory(Base):
     )
     user_agent: Mapped[str] = mapped_column(nullable=False)
     timestamp: Mapped[datetime] = mapped_column(
-        default=datetime.now, nullable=False
+        default=datetime.now, primary_key=True, nullable=False
     )
 
     user: Mapped['User'] = relationship('User', back_populates='auth_history')
+
+
+# Партиция для месяцев, которые обслуживание еще не создало. Миграции
+# создают ее отдельно, событие нужно для create_all.
+event.listen(
+    AuthHistory.__table__,
+    'after_create',
+    DDL(
+        'CREATE TABLE auth_history_default PARTITION OF auth_history DEFAULT'
+    ).execute_if(dialect='postgresql'),
+)
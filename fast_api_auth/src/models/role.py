@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Iterable
 from uuid import UUID
 
 import sqlalchemy as sa
@@ -8,13 +9,40 @@ from src.db.postgres import Base
 
 
 class Permissions(Enum):
-    """Перечисление возможных прав доступа к ресурсу."""
+    """Перечисление возможных прав доступа к ресурсу.
+
+    Каждому праву соответствует бит маски в порядке объявления, поэтому
+    новые права добавляются только в конец.
+    """
 
     read = 'read'
     write = 'write'
     delete = 'delete'
     update = 'update'
 
+    @property
+    def bit(self) -> int:
+        """Бит права в маске разрешений."""
+        return _PERMISSION_BITS[self]
+
+    @classmethod
+    def to_mask(cls, permissions: Iterable['Permissions']) -> int:
+        """Объединяет права в битовую маску."""
+        mask = 0
+        for permission in permissions:
+            mask |= permission.bit
+        return mask
+
+    @classmethod
+    def from_mask(cls, mask: int) -> list['Permissions']:
+        """Раскладывает битовую маску на права."""
+        return [permission for permission in cls if mask & permission.bit]
+
+
+_PERMISSION_BITS = {
+    permission: 1 << index for index, permission in enumerate(Permissions)
+}
+
 
 class Role(Base):
     """Модель роли пользователя."""
@@ -28,6 +56,12 @@ class Role(Base):
 class UserRole(Base):
     """Модель связи пользователя и роли."""
 
+    __table_args__ = (
+        sa.UniqueConstraint(
+            'user_id', 'role_id', name='uq_user_role_user_id_role_id'
+        ),
+    )
+
     user_id: Mapped[UUID] = mapped_column(
         sa.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
     role_id: Mapped[UUID] = mapped_column(
@@ -14,5 +14,9 @@ class User(SQLAlchemyBaseUserTable[UUID], Base):
         'AuthHistory', back_populates='user', cascade='all, delete-orphan'
     )
 
+    # Не колонка: роли и маска прав для claims токена. Заполняется явно
+    # (UserManager.load_access), чтобы не было скрытых запросов к БД.
+    access = None
+
     def __repr__(self) -> str:
         return f'Email: {self.email}'
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from uuid import UUID
 
 from pydantic import Field
@@ -12,3 +13,10 @@ class UserAuthHistory(UUIDMixin):
     user_id: UUID
     user_agent: str
     timestamp: datetime = Field(default=datetime.now())
+
+
+class ExportFormat(str, Enum):
+    """Формат выгрузки истории авторизации."""
+
+    ndjson = 'ndjson'
+    csv = 'csv'
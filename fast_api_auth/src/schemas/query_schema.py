@@ -0,0 +1,22 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class QuerySort(str, Enum):
+    """Поле сортировки статистики SQL-запросов."""
+
+    total = 'total'
+    count = 'count'
+    mean = 'mean'
+    max = 'max'
+
+
+class QueryStatistic(BaseModel):
+    """Статистика SQL-запросов с одним отпечатком."""
+
+    fingerprint: str
+    count: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
@@ -1,7 +1,8 @@
 from uuid import UUID
 
-from pydantic import field_validator
+from pydantic import Field, field_validator, model_validator
 
+from src.core.config import project_settings
 from src.models.dto import AbstractDTO
 from src.models.role import Permissions
 
@@ -37,3 +38,32 @@ class RoleGetFull(RoleCreate):
     """Схема для получения полной информации о роли."""
 
     id: UUID
+
+
+class RoleAssignment(AbstractDTO):
+    """Схема массового назначения или снятия ролей."""
+
+    user_ids: list[UUID] = Field(
+        min_length=1, max_length=project_settings.user_role_max_batch
+    )
+    role_ids: list[UUID] = Field(
+        min_length=1, max_length=project_settings.user_role_max_roles
+    )
+
+    @model_validator(mode='after')
+    def _check_batch_size(self) -> 'RoleAssignment':
+        """Ограничивает число пар пользователь-роль в одном запросе."""
+        pairs = len(self.user_ids) * len(self.role_ids)
+        if pairs > project_settings.user_role_max_batch:
+            raise ValueError(
+                f'Too many user-role pairs: {pairs} '
+                f'(max {project_settings.user_role_max_batch})'
+            )
+        return self
+
+
+class RoleAssignmentResult(AbstractDTO):
+    """Схема результата массового назначения или снятия ролей."""
+
+    requested: int
+    changed: int
@@ -0,0 +1,31 @@
+from uuid import UUID
+
+from pydantic import Field
+
+from src.core.config import project_settings
+from src.models.dto import AbstractDTO
+
+
+class TokenIntrospectRequest(AbstractDTO):
+    """Схема запроса пакетной проверки токенов."""
+
+    tokens: list[str] = Field(
+        min_length=1, max_length=project_settings.introspection_max_batch
+    )
+
+
+class TokenIntrospection(AbstractDTO):
+    """Результат проверки одного токена."""
+
+    active: bool
+    token_type: str | None = None
+    user_id: UUID | None = None
+    exp: int | None = None
+    roles: list[str] = Field(default_factory=list)
+    permissions: list[str] = Field(default_factory=list)
+
+
+class TokenIntrospectResponse(AbstractDTO):
+    """Схема ответа пакетной проверки в порядке входных токенов."""
+
+    results: list[TokenIntrospection]
@@ -0,0 +1,285 @@
+import asyncio
+import csv
+import io
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator
+from uuid import UUID, uuid4
+
+import orjson
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import project_settings
+from src.db.postgres import AsyncSessionLocal, engine, replica_pool
+from src.db.postgres_dao import PostgresDAO, json_default
+from src.models.auth_history import AuthHistory
+from src.schemas.auth_shema import ExportFormat
+
+
+logger = logging.getLogger(__name__)
+
+
+class AuthHistoryWriter:
+    """Фоновая пакетная запись истории входов.
+
+    Запросы входа только кладут запись в ограниченную очередь. Фоновая
+    задача собирает записи в пакет до `batch_size` штук или до истечения
+    `flush_interval` и пишет его одним многострочным INSERT.
+
+    Attributes:
+        session_factory: Фабрика сессий БД
+        batch_size: Максимальный размер пакета
+        flush_interval: Максимальное время накопления пакета в секундах
+        written: Количество записанных строк
+        dropped: Количество строк, потерянных из-за переполнения или ошибок
+
+    """
+
+    def __init__(
+            self,
+            session_factory: sessionmaker[AsyncSession],
+            max_queue: int,
+            batch_size: int,
+            flush_interval: float,
+        ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self._queue: asyncio.Queue[dict[str, any] | None] = asyncio.Queue(
+            maxsize=max_queue
+        )
+        self._task: asyncio.Task | None = None
+
+    def submit(
+            self,
+            user_id: UUID,
+            user_agent: str,
+            timestamp: datetime | None = None,
+        ) -> None:
+        """Ставит запись истории в очередь без ожидания.
+
+        При переполнении очереди запись отбрасывается: вход пользователя
+        важнее строки в истории.
+        """
+        if self._task is None:
+            logger.warning('Запись истории входов не запущена')
+            self.dropped += 1
+            return
+        try:
+            self._queue.put_nowait({
+                'id': uuid4(),
+                'user_id': user_id,
+                'user_agent': user_agent,
+                'timestamp': timestamp or datetime.now(),
+            })
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning('Очередь истории входов переполнена')
+
+    async def start(self) -> None:
+        """Запускает фоновую задачу записи."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Дописывает накопленные записи и останавливает задачу."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает заполненность очереди и счетчики записи."""
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+        }
+
+    async def _run(self) -> None:
+        """Собирает пакеты из очереди и записывает их до остановки."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[dict[str, any]]) -> None:
+        """Записывает пакет одним INSERT ... VALUES (...), (...)."""
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(AuthHistory).values(batch))
+                await session.commit()
+        except Exception:
+            self.dropped += len(batch)
+            logger.exception(
+                f'Не удалось записать {len(batch)} записей истории входов'
+            )
+        else:
+            self.written += len(batch)
+
+
+"""Фоновый писатель истории входов, запускается в lifespan."""
+auth_history_writer = AuthHistoryWriter(
+    AsyncSessionLocal,
+    max_queue=project_settings.auth_history_queue_size,
+    batch_size=project_settings.auth_history_batch_size,
+    flush_interval=project_settings.auth_history_flush_interval,
+)
+
+
+EXPORT_COLUMNS = ('id', 'user_id', 'user_agent', 'timestamp')
+
+
+# Первые символы, с которых табличные редакторы начинают формулу
+_CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value: any) -> any:
+    """Экранирует строку, которую редактор таблиц принял бы за формулу.
+
+    `user_agent` присылает клиент, поэтому такие значения выгружаются с
+    апострофом в начале.
+    """
+    if isinstance(value, str) and value.startswith(_CSV_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def get_auth_history_service() -> 'AuthHistoryService':
+    """Функция для получения сервиса истории входов."""
+    return AuthHistoryService()
+
+
+@dataclass
+class AuthHistoryService:
+    """Сервис чтения истории входов."""
+
+    batch_size: int = project_settings.auth_history_export_batch_size
+
+    async def export(
+            self,
+            export_format: ExportFormat,
+            user_id: UUID | None = None,
+            since: datetime | None = None,
+            until: datetime | None = None,
+        ) -> AsyncIterator[bytes]:
+        """Выгружает историю входов по возрастанию времени.
+
+        Строки читаются серверным курсором порциями по `batch_size` и
+        отдаются такими же порциями, поэтому память не зависит от
+        объема выгрузки. Сессия открывается здесь, а не в зависимости:
+        зависимости закрываются до начала отправки потокового ответа.
+        Запрос выполняется до возврата итератора, поэтому его ошибки
+        приходят клиенту статусом ответа, а не обрывом тела.
+
+        Args:
+            export_format: NDJSON или CSV
+            user_id: Пользователь, None для всех
+            since: Начало периода включительно, naive в часовом поясе БД
+            until: Конец периода не включительно
+
+        Returns:
+            AsyncIterator: Порции выгрузки в байтах
+
+        Raises:
+            ValueError: Если фильтры выгрузки неверны
+
+        """
+        filters = {}
+        if user_id is not None:
+            filters['user_id'] = user_id
+        period = {}
+        if since is not None:
+            period['gte'] = since
+        if until is not None:
+            period['lt'] = until
+        if period:
+            filters['timestamp'] = period
+
+        session = AsyncSession(replica_pool.choose() or engine)
+        rows = PostgresDAO(session).stream(
+            'auth_history',
+            sort=[{'field': 'timestamp'}],
+            filters=filters,
+            batch_size=self.batch_size,
+        )
+        try:
+            first = await anext(rows, None)
+        except BaseException:
+            await rows.aclose()
+            await session.close()
+            raise
+        return self._chunks(export_format, session, rows, first)
+
+    async def _chunks(
+            self,
+            export_format: ExportFormat,
+            session: AsyncSession,
+            rows: AsyncIterator[dict[str, any]],
+            first: dict[str, any] | None,
+        ) -> AsyncIterator[bytes]:
+        """Отдает выгрузку порциями и закрывает курсор и сессию."""
+        try:
+            if export_format == ExportFormat.csv:
+                yield self._csv_chunk([EXPORT_COLUMNS])
+            if first is None:
+                return
+            batch = [first]
+            async for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    yield self._chunk(export_format, batch)
+                    batch = []
+            if batch:
+                yield self._chunk(export_format, batch)
+        finally:
+            await rows.aclose()
+            await session.close()
+
+    def _chunk(
+            self, export_format: ExportFormat, rows: list[dict[str, any]]
+        ) -> bytes:
+        """Сериализует порцию строк."""
+        if export_format == ExportFormat.csv:
+            return self._csv_chunk(
+                [_csv_cell(row[column]) for column in EXPORT_COLUMNS]
+                for row in rows
+            )
+        return b''.join(
+            orjson.dumps(
+                row, default=json_default, option=orjson.OPT_APPEND_NEWLINE
+            )
+            for row in rows
+        )
+
+    @staticmethod
+    def _csv_chunk(rows: list[list[any]]) -> bytes:
+        """Сериализует строки в CSV."""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
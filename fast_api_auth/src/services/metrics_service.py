@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Callable
+
+from src.core.config import log_handler, project_settings
+from src.core.metrics import (
+    BREAKER_STATE,
+    COMPONENT_STATS,
+    mark_process_dead,
+    render_latest,
+)
+from src.core.revocation import revocation_list
+from src.core.user_core import password_helper
+from src.db.partitions import auth_history_partitions
+from src.db.permission_cache import access_cache
+from src.db.query_log import query_log
+from src.db.user_cache import user_cache
+from src.services.auth_history_service import auth_history_writer
+from src.utils.circuit_breaker import BreakerState, breakers
+
+
+logger = logging.getLogger(__name__)
+
+_BREAKER_STATE_CODES = {
+    BreakerState.CLOSED: 0,
+    BreakerState.HALF_OPEN: 1,
+    BreakerState.OPEN: 2,
+}
+
+
+class MetricsService:
+    """Перенос счетчиков компонентов воркера в метрики Prometheus.
+
+    Кеши, пулы и очереди считают события в своих атрибутах и отдают их
+    через `stats()`. Сервис периодически копирует эти значения в gauge:
+    в режиме нескольких воркеров значения каждого процесса попадают в
+    общий каталог, и ответ любого воркера содержит сумму по всем живым
+    процессам, а не только по тому, кто обработал запрос метрик.
+
+    Attributes:
+        sources: Функции `stats()` по имени компонента
+        interval: Период обновления в секундах
+
+    """
+
+    def __init__(
+            self,
+            sources: dict[str, Callable[[], dict[str, any]]],
+            interval: float,
+        ) -> None:
+        self.sources = sources
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def collect(self) -> None:
+        """Копирует текущие счетчики компонентов и предохранителей."""
+        for component, stats in self.sources.items():
+            for stat, value in stats().items():
+                if isinstance(value, (int, float)):
+                    COMPONENT_STATS.labels(component, stat).set(value)
+        for name, breaker in breakers.items():
+            BREAKER_STATE.labels(name).set(
+                _BREAKER_STATE_CODES[breaker.state]
+            )
+            for stat, value in breaker.stats().items():
+                if isinstance(value, int):
+                    COMPONENT_STATS.labels(f'breaker_{name}', stat).set(value)
+
+    def render(self) -> tuple[bytes, str]:
+        """Обновляет счетчики и формирует ответ в формате Prometheus."""
+        self.collect()
+        return render_latest()
+
+    async def start(self) -> None:
+        """Запускает периодическое обновление счетчиков."""
+        if self._task is None:
+            self.collect()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает обновление и снимает live-метрики процесса."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        mark_process_dead()
+
+    async def _run(self) -> None:
+        """Обновляет счетчики до остановки."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.collect()
+            except Exception:
+                logger.exception('Не удалось обновить метрики компонентов')
+
+
+"""Метрики компонентов воркера, обновление запускается в lifespan."""
+metrics_service = MetricsService(
+    {
+        'user_cache': user_cache.stats,
+        'access_cache': access_cache.stats,
+        'password_hasher': password_helper.stats,
+        'revocation_list': revocation_list.stats,
+        'auth_history_writer': auth_history_writer.stats,
+        'auth_history_partitions': auth_history_partitions.stats,
+        'log_queue': log_handler.stats,
+        'query_log': query_log.stats,
+    },
+    interval=project_settings.metrics_refresh_interval,
+)
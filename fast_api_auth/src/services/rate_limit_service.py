@@ -0,0 +1,117 @@
+import logging
+import math
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from redis import asyncio as aioredis
+from redis import exceptions as redis_exceptions
+from redis.commands.core import AsyncScript
+
+from src.core.config import project_settings
+from src.db.redis_cache import get_redis_client
+
+
+logger = logging.getLogger(__name__)
+
+# Token bucket для каждого ключа хранится в hash {t: токены, ts: время в
+# мс}. Попытка проходит, только если во всех корзинах есть токен, и тогда
+# списывает его из каждой. Время берется из Redis, чтобы воркеры с разными
+# часами работали с одной шкалой. Возвращает 0 или паузу до следующей
+# попытки в миллисекундах.
+# KEYS - корзины; ARGV - пары (емкость, пополнение в токенах за мс)
+_TOKEN_BUCKET_SCRIPT = AsyncScript(None, b"""
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local wait = 0
+local tokens = {}
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', KEYS[i], 't', 'ts')
+    local available = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    available = math.min(capacity, available + (now - updated) * rate)
+    if available < 1 then
+        wait = math.max(wait, math.ceil((1 - available) / rate))
+    end
+    tokens[i] = available
+end
+if wait > 0 then
+    return wait
+end
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    redis.call('HSET', KEYS[i], 't', tostring(tokens[i] - 1), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate))
+end
+return 0
+""")
+
+
+def get_rate_limit_service(
+        redis: aioredis.Redis = Depends(get_redis_client)
+    ) -> 'RateLimitService':
+    """Функция для получения сервиса ограничения частоты запросов."""
+    return RateLimitService(redis)
+
+
+@dataclass
+class RateLimitService:
+    """Ограничение частоты попыток входа по IP и по email.
+
+    Обе корзины проверяются и списываются одним атомарным Lua-скриптом,
+    поэтому отказ стоит один запрос к Redis и не доходит до проверки
+    пароля.
+    """
+
+    redis: aioredis.Redis
+
+    async def check_login(self, ip: str, email: str) -> None:
+        """Списывает попытку входа.
+
+        Если Redis недоступен, попытка пропускается: недоступность
+        ограничителя не должна блокировать вход.
+
+        Args:
+            ip: Адрес клиента
+            email: Email из формы входа
+
+        Raises:
+            HTTPException: 429 с `Retry-After`, если лимит исчерпан
+
+        """
+        try:
+            wait_ms = await _TOKEN_BUCKET_SCRIPT(
+                keys=[
+                    f'login-limit:ip:{ip}',
+                    f'login-limit:email:{email.strip().lower()}',
+                ],
+                args=[
+                    project_settings.login_ip_burst,
+                    project_settings.login_ip_per_minute / 60000,
+                    project_settings.login_email_burst,
+                    project_settings.login_email_per_minute / 60000,
+                ],
+                client=self.redis,
+            )
+        except (redis_exceptions.RedisError, OSError) as error:
+            logger.warning(f'Ограничитель попыток входа недоступен: {error}')
+            return
+        if wait_ms:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail='Слишком много попыток входа, повторите позже',
+                headers={'Retry-After': str(math.ceil(wait_ms / 1000))},
+            )
+
+
+async def limit_login_attempts(
+    request: Request,
+    credentials: OAuth2PasswordRequestForm = Depends(),
+    rate_limit_service: RateLimitService = Depends(get_rate_limit_service),
+) -> None:
+    """Зависимость маршрута входа, выполняемая до проверки пароля."""
+    ip = request.client.host if request.client else 'unknown'
+    await rate_limit_service.check_login(ip, credentials.username)
@@ -1,38 +1,161 @@
+import logging
 from dataclasses import dataclass
+from hashlib import blake2b
 from http import HTTPStatus
 from uuid import UUID
 
+import orjson
 from fastapi import Depends, HTTPException
+from fastapi_cache import FastAPICache
+from redis import asyncio as aioredis
+from redis import exceptions as redis_exceptions
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import project_settings
+from src.core.profiling import profiled
 from src.crud.base import CRUDBase
-from src.db.postgres import get_async_session
+from src.crud.user_role import CRUDUserRole, user_role_crud
+from src.db.permission_cache import invalidate_access
+from src.db.postgres import SessionRouter, get_session_router
+from src.db.postgres_dao import json_default
+from src.db.redis_cache import get_redis_client, invalidation_bus
 from src.models.role import Role
-from src.schemas.role_schema import RoleCreate, RoleGetFull, RoleUpdate
+from src.schemas.role_schema import (
+    RoleAssignment,
+    RoleAssignmentResult,
+    RoleCreate,
+    RoleGetFull,
+    RoleUpdate,
+)
 
 
+logger = logging.getLogger(__name__)
+
+ROLES_VERSION_KEY = 'roles:version'
+
+
+@profiled('role_service')
 def get_role_service(
-        session: AsyncSession = Depends(get_async_session)
+        sessions: SessionRouter = Depends(get_session_router),
+        redis: aioredis.Redis = Depends(get_redis_client),
     ) -> 'RoleService':
     """Функция для получения сервиса ролей."""
-    return RoleService(session)
+    return RoleService(sessions, redis)
+
+
+@dataclass(frozen=True, slots=True)
+class RolesPage:
+    """Сериализованная страница списка ролей.
+
+    Attributes:
+        body: JSON-массив ролей
+        etag: Сильный ETag, хеш `body`
+        next_cursor: Курсор следующей страницы или None для последней
+
+    """
+
+    body: bytes
+    etag: str
+    next_cursor: str | None
+
+    def dump(self) -> bytes:
+        """Упаковывает страницу для кеша."""
+        return (
+            f'{self.etag}\n{self.next_cursor or ""}\n'.encode() + self.body
+        )
+
+    @classmethod
+    def load(cls, data: bytes) -> 'RolesPage':
+        """Распаковывает страницу из кеша."""
+        etag, next_cursor, body = data.split(b'\n', 2)
+        return cls(body, etag.decode(), next_cursor.decode() or None)
 
 
 @dataclass
 class RoleService:
-    """Сервис для работы с ролями."""
+    """Сервис для работы с ролями.
 
-    session: AsyncSession
+    Чтение списка идет через реплику, запись и чтение перед записью
+    через основную БД. Страницы списка кешируются в бэкенде FastAPICache
+    под ключом с версией списка, которую каждое изменение роли
+    увеличивает в Redis: старые страницы становятся недостижимыми и
+    удаляются по TTL.
+    """
+
+    sessions: SessionRouter
+    redis: aioredis.Redis
     role_crud: CRUDBase = CRUDBase(Role)
+    user_role_crud: CRUDUserRole = user_role_crud
+
+    @property
+    def session(self) -> AsyncSession:
+        """Сессия основной БД."""
+        return self.sessions.primary
+
+    async def get_page(self, limit: int, cursor: str | None) -> RolesPage:
+        """Получение страницы списка ролей из кеша или БД.
 
-    async def get_all(self) -> list[RoleGetFull]:
-        """Получение списка ролей."""
-        roles_obj = await self.role_crud.get_multi(self.session)
-        return [RoleGetFull.model_validate(role_obj) for role_obj in roles_obj]
+        Если Redis недоступен, страница читается из БД без кеша.
+
+        Args:
+            limit: Размер страницы
+            cursor: Курсор из предыдущей страницы
+
+        """
+        key = None
+        try:
+            version = int(await self.redis.get(ROLES_VERSION_KEY) or 0)
+            key = (
+                f'{FastAPICache.get_prefix()}:roles:{version}:'
+                f'{cursor or ""}:{limit}'
+            )
+            cached = await FastAPICache.get_backend().get(key)
+            if cached is not None:
+                return RolesPage.load(cached)
+        except (redis_exceptions.RedisError, OSError) as error:
+            logger.warning(f'Кеш списка ролей недоступен: {error}')
+
+        try:
+            roles = await self.role_crud.get_multi(
+                self.sessions.reader, limit=limit, cursor=cursor
+            )
+        except ValueError as error:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail=str(error)
+            )
+        body = orjson.dumps(roles.items, default=json_default)
+        page = RolesPage(
+            body, f'"{blake2b(body, digest_size=16).hexdigest()}"',
+            roles.next_cursor,
+        )
+
+        if key is not None:
+            try:
+                await FastAPICache.get_backend().set(
+                    key, page.dump(), project_settings.roles_cache_ttl_seconds
+                )
+            except (redis_exceptions.RedisError, OSError) as error:
+                logger.warning(f'Не удалось сохранить список ролей: {error}')
+        return page
+
+    async def _bump_version(self) -> None:
+        """Делает закешированные страницы списка ролей устаревшими.
+
+        Вызывается после коммита, поэтому ошибка Redis не прерывает
+        запрос: устаревшие страницы истекут по TTL.
+        """
+        try:
+            await self.redis.incr(ROLES_VERSION_KEY)
+        except (redis_exceptions.RedisError, OSError) as error:
+            logger.warning(
+                f'Не удалось сбросить кеш списка ролей: {error}'
+            )
 
     async def create(self, data: RoleCreate) -> RoleGetFull:
         """Создание новой роли."""
         role_obj = await self.role_crud.create(data, self.session)
+        self.sessions.pin()
+        await self._bump_version()
         return RoleGetFull.model_validate(role_obj)
 
     async def update(self, role_id: UUID, data: RoleUpdate) -> RoleGetFull:
@@ -43,6 +166,9 @@ class RoleService:
                 status_code=HTTPStatus.NOT_FOUND, detail='Role not found'
             )
         role_obj = await self.role_crud.update(role, data, self.session)
+        self.sessions.pin()
+        await self._bump_version()
+        await invalidation_bus.invalidate('r', str(role_id))
         return RoleGetFull.model_validate(role_obj)
 
     async def delete(self, role_id: UUID) -> None:
@@ -53,3 +179,34 @@ class RoleService:
                 status_code=HTTPStatus.NOT_FOUND, detail='Role not found'
             )
         await self.role_crud.remove(role, self.session)
+        self.sessions.pin()
+        await self._bump_version()
+        await invalidation_bus.invalidate('r', str(role_id))
+
+    async def assign(self, data: RoleAssignment) -> RoleAssignmentResult:
+        """Массовое назначение ролей пользователям."""
+        user_ids = list(dict.fromkeys(data.user_ids))
+        role_ids = list(dict.fromkeys(data.role_ids))
+        changed = await self.user_role_crud.assign_many(
+            user_ids, role_ids, self.session
+        )
+        self.sessions.pin()
+        if changed:
+            await invalidate_access(user_ids)
+        return RoleAssignmentResult(
+            requested=len(user_ids) * len(role_ids), changed=changed
+        )
+
+    async def unassign(self, data: RoleAssignment) -> RoleAssignmentResult:
+        """Массовое снятие ролей с пользователей."""
+        user_ids = list(dict.fromkeys(data.user_ids))
+        role_ids = list(dict.fromkeys(data.role_ids))
+        changed = await self.user_role_crud.unassign_many(
+            user_ids, role_ids, self.session
+        )
+        self.sessions.pin()
+        if changed:
+            await invalidate_access(user_ids)
+        return RoleAssignmentResult(
+            requested=len(user_ids) * len(role_ids), changed=changed
+        )
@@ -1,24 +1,89 @@
-import jwt
-from fastapi import HTTPException, status
+import logging
+import time
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, status
 from jwt import ExpiredSignatureError, InvalidAudienceError, InvalidTokenError
+from redis import asyncio as aioredis
+from redis.commands.core import AsyncScript
 
 from src.core.config import project_settings
-from src.db.redis_cache import RedisClientFactory
+from src.core.keys import key_ring
+from src.core.revocation import revocation_list
+from src.db.redis_cache import get_redis_client
+from src.models.role import Permissions
+from src.schemas.token_schema import TokenIntrospection
+
+
+logger = logging.getLogger(__name__)
+
+TOKEN_AUDIENCE = 'fastapi-users:auth'
+
+ROTATION_OK = 1
+ROTATION_UNKNOWN = 0
+ROTATION_REUSED = -1
+
+# Семейства refresh токенов пользователя хранятся в hash
+# refresh_families:<user_id>: поле - идентификатор семейства (устройства),
+# значение - `<jti>:<exp>` последнего выпущенного токена. Истекшие
+# семейства удаляются при каждой записи, а TTL всего hash продлевается
+# до срока жизни нового токена.
+_PRUNE_LUA = """
+local function prune(key, now)
+    local entries = redis.call('HGETALL', key)
+    for i = 1, #entries, 2 do
+        local exp = tonumber(string.match(entries[i + 1], ':(%d+)$'))
+        if exp == nil or exp <= now then
+            redis.call('HDEL', key, entries[i])
+        end
+    end
+end
+"""
 
+# KEYS[1] - hash семейств; ARGV: семейство, jti, exp, now, ttl
+_STORE_SCRIPT = AsyncScript(None, (_PRUNE_LUA + """
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2] .. ':' .. ARGV[3])
+prune(KEYS[1], tonumber(ARGV[4]))
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+""").encode())
 
+# KEYS[1] - hash семейств;
+# ARGV: семейство, старый jti, новый jti, новый exp, now, ttl
+_ROTATE_SCRIPT = AsyncScript(None, (_PRUNE_LUA + """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current then
+    return 0
+end
+if string.match(current, '^[^:]+') ~= ARGV[2] then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    return -1
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3] .. ':' .. ARGV[4])
+prune(KEYS[1], tonumber(ARGV[5]))
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return 1
+""").encode())
+
+
+def get_token_service(
+        redis: aioredis.Redis = Depends(get_redis_client)
+    ) -> 'TokenService':
+    """Функция для получения сервиса токенов."""
+    return TokenService(redis)
+
+
+@dataclass
 class TokenService:
     """Унифицированный сервис для работы с JWT токенами."""
 
+    redis: aioredis.Redis
+
     @staticmethod
     def encode_jwt(payload: dict[str, any]) -> str:
         """Кодирование данных в JWT токен."""
         try:
-            return jwt.encode(
-                payload,
-                project_settings.secret,
-                algorithm='HS256',
-                audience='fastapi-users:auth'
-            )
+            return key_ring.encode({'aud': TOKEN_AUDIENCE, **payload})
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -29,12 +94,7 @@ class TokenService:
     def decode_jwt(token: str) -> dict[str, any]:
         """Декодирование JWT токена с обработкой ошибок."""
         try:
-            return jwt.decode(
-                token,
-                project_settings.secret,
-                algorithms=['HS256'],
-                audience='fastapi-users:auth'
-            )
+            return key_ring.decode(token, TOKEN_AUDIENCE)
         except ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,45 +116,174 @@ class TokenService:
                 detail=f'Token decoding error: {str(e)}'
             )
 
+    async def introspect(self, tokens: list[str]) -> list[TokenIntrospection]:
+        """Пакетная проверка токенов.
+
+        Подписи проверяются локально. Проверки в Redis для всего пакета
+        выполняются одним конвейером, а не отдельным запросом на токен.
+
+        Args:
+            tokens: Access и refresh токены
+
+        Returns:
+            list[TokenIntrospection]: Результаты в порядке входных токенов
+
+        """
+        claims_list = []
+        for token in tokens:
+            try:
+                claims_list.append(self.decode_jwt(token))
+            except HTTPException:
+                claims_list.append(None)
+
+        # Access token отличается от refresh наличием claims пользователя.
+        # Refresh token сверяется с последним токеном своего семейства,
+        # access token с отметкой об отзыве, но только если сработал
+        # локальный фильтр отзывов.
+        stored = {}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for index, claims in enumerate(claims_list):
+                if claims is None:
+                    continue
+                if 'is_active' not in claims:
+                    if 'fam' in claims:
+                        pipe.hget(
+                            self._families_key(claims['sub']), claims['fam']
+                        )
+                        stored[index] = None
+                elif 'jti' in claims and revocation_list.might_be_revoked(
+                    claims['jti']
+                ):
+                    pipe.get(revocation_list.key(claims['jti']))
+                    stored[index] = None
+            if stored:
+                try:
+                    stored_values = await pipe.execute()
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f'Redis validation error: {str(e)}'
+                    )
+                stored = dict(zip(stored, stored_values))
+
+        results = []
+        for index, claims in enumerate(claims_list):
+            if claims is None:
+                results.append(TokenIntrospection(active=False))
+            elif 'is_active' not in claims:
+                current = stored.get(index)
+                results.append(TokenIntrospection(
+                    active=(
+                        current is not None
+                        and current.decode().partition(':')[0]
+                        == claims['jti']
+                    ),
+                    token_type='refresh',
+                    user_id=claims['sub'],
+                    exp=claims.get('exp'),
+                ))
+            else:
+                results.append(TokenIntrospection(
+                    active=(
+                        bool(claims['is_active'])
+                        and stored.get(index) is None
+                    ),
+                    token_type='access',
+                    user_id=claims['sub'],
+                    exp=claims.get('exp'),
+                    roles=claims.get('roles', []),
+                    permissions=[
+                        permission.value for permission
+                        in Permissions.from_mask(claims.get('pm', 0))
+                    ],
+                ))
+        return results
+
     @staticmethod
-    async def validate_refresh_token(token: str, user_id: str) -> bool:
-        """Проверка refresh токена в Redis."""
+    def _families_key(user_id: str) -> str:
+        """Ключ Redis с семействами refresh токенов пользователя."""
+        return f'refresh_families:{user_id}'
+
+    async def store_refresh_token(self, claims: dict[str, any]) -> None:
+        """Сохраняет новое семейство refresh токенов (новый вход).
+
+        Args:
+            claims: Claims выпущенного refresh токена
+
+        """
         try:
-            redis = await RedisClientFactory.create(project_settings.redis_dsn)
-            stored_token = await redis.get(f'refresh_token:{user_id}')
+            await _STORE_SCRIPT(
+                keys=[self._families_key(claims['sub'])],
+                args=[
+                    claims['fam'], claims['jti'], claims['exp'],
+                    int(time.time()),
+                    project_settings.jwt_refresh_lifetime_seconds,
+                ],
+                client=self.redis,
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f'Redis storage error: {str(e)}'
+            )
+
+    async def rotate_refresh_token(
+            self, claims: dict[str, any], new_claims: dict[str, any]
+        ) -> None:
+        """Заменяет refresh токен семейства новым за один запрос к Redis.
+
+        Если предъявлен не последний токен семейства, он был украден или
+        использован повторно: семейство отзывается целиком.
 
-            if not stored_token:
-                return False
+        Args:
+            claims: Claims предъявленного refresh токена
+            new_claims: Claims нового токена того же семейства
 
-            return stored_token.decode('utf-8') == token
+        Raises:
+            HTTPException: 401, если семейство отозвано или токен
+                использован повторно
+
+        """
+        try:
+            result = await _ROTATE_SCRIPT(
+                keys=[self._families_key(claims['sub'])],
+                args=[
+                    claims['fam'], claims['jti'], new_claims['jti'],
+                    new_claims['exp'], int(time.time()),
+                    project_settings.jwt_refresh_lifetime_seconds,
+                ],
+                client=self.redis,
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f'Redis validation error: {str(e)}'
             )
+        if result == ROTATION_REUSED:
+            logger.warning(
+                f'Повторное использование refresh токена пользователя '
+                f'{claims["sub"]}, семейство {claims["fam"]} отозвано'
+            )
+        if result != ROTATION_OK:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='Недействительный токен обновления',
+            )
 
-    @staticmethod
-    async def store_refresh_token(
-        user_id: str, token: str, expire_seconds: int = 86400
-    ) -> None:
-        """Сохранение refresh токена в Redis."""
+    async def revoke_refresh_family(self, user_id: str, family: str) -> None:
+        """Отзывает refresh токены одного устройства."""
         try:
-            redis = await RedisClientFactory.create(project_settings.redis_dsn)
-            await redis.setex(
-                f'refresh_token:{user_id}', expire_seconds, token
-            )
+            await self.redis.hdel(self._families_key(user_id), family)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f'Redis storage error: {str(e)}'
+                detail=f'Redis deletion error: {str(e)}'
             )
 
-    @staticmethod
-    async def revoke_refresh_token(user_id: str) -> None:
-        """Удаление refresh токена из Redis."""
+    async def revoke_refresh_token(self, user_id: str) -> None:
+        """Отзывает refresh токены пользователя на всех устройствах."""
         try:
-            redis = await RedisClientFactory.create(project_settings.redis_dsn)
-            await redis.delete(f'refresh_token:{user_id}')
+            await self.redis.delete(self._families_key(user_id))
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,10 +1,11 @@
+import asyncio
+import inspect
 import logging
+import random
 import time
 from functools import wraps
 from typing import Callable, ParamSpec, TypeVar
 
-from redis.exceptions import ConnectionError as RedisError
-
 
 P = ParamSpec('P')
 R = TypeVar('R')
@@ -13,42 +14,79 @@ logger = logging.getLogger(__name__)
 
 
 def backoff(
-    error_connection: type[RedisError],
+    error_connection: type[Exception] | tuple[type[Exception], ...],
     start_sleep_time: float = 0.1,
     factor: int = 2,
     border_sleep_time: float = 10.0,
     max_attempts: int = 15,
-) -> Callable[[Callable[P, R]], Callable[P, R | None]]:
-    """Backoff для повторного выполнения при ошибках."""
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Backoff для повторного выполнения при ошибках.
 
-    def func_wrapper(func: Callable[P, R]) -> Callable[P, R | None]:
-        @wraps(func)
-        def inner(*args: P.args, **kwargs: P.kwargs) -> R | None:
-            sleep_time: float = start_sleep_time
-            attempts: int = 0
+    Пауза перед попыткой `n` выбирается случайно из
+    `[0, min(border_sleep_time, start_sleep_time * factor ** n)]` (full
+    jitter), поэтому воркеры, потерявшие соединение одновременно, не
+    переподключаются синхронными волнами. Корутинные функции ждут через
+    `asyncio.sleep` и не блокируют event loop.
 
-            while attempts < max_attempts:
-                try:
-                    return func(*args, **kwargs)
-                except error_connection as error:
-                    attempts += 1
-                    sleep_time = min(sleep_time * 2**factor, border_sleep_time)
+    Args:
+        error_connection: Исключения, при которых выполняется повтор
+        start_sleep_time: Верхняя граница первой паузы в секундах
+        factor: Множитель роста верхней границы паузы
+        border_sleep_time: Максимальная пауза в секундах
+        max_attempts: Максимальное количество попыток
+
+    Raises:
+        error_connection: Последняя ошибка, если попытки исчерпаны
 
-                    logger.exception(
-                        'Ошибка подключения в функции '
-                        f'{func.__name__}: {error}. '
-                        f'Повторная попытка через {sleep_time} секунд... '
-                        f'(Попытка {attempts}/{max_attempts})'
-                    )
+    """
 
-                    time.sleep(sleep_time)
+    def sleep_time(attempt: int) -> float:
+        return random.uniform(
+            0, min(border_sleep_time, start_sleep_time * factor ** attempt)
+        )
 
+    def log_retry(func: Callable, error: Exception, attempt: int) -> None:
+        if attempt >= max_attempts:
             logger.error(
                 f'Достигнуто максимальное количество попыток '
-                f'в функции {func.__name__}. '
-                f'Функция завершилась с ошибкой.'
+                f'в функции {func.__name__}: {error}'
+            )
+        else:
+            logger.warning(
+                'Ошибка подключения в функции '
+                f'{func.__name__}: {error}. '
+                f'(Попытка {attempt}/{max_attempts})'
             )
-            return None
+
+    def func_wrapper(func: Callable[P, R]) -> Callable[P, R]:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_inner(*args: P.args, **kwargs: P.kwargs) -> R:
+                attempt = 0
+                while True:
+                    try:
+                        return await func(*args, **kwargs)
+                    except error_connection as error:
+                        attempt += 1
+                        log_retry(func, error, attempt)
+                        if attempt >= max_attempts:
+                            raise
+                    await asyncio.sleep(sleep_time(attempt - 1))
+
+            return async_inner
+
+        @wraps(func)
+        def inner(*args: P.args, **kwargs: P.kwargs) -> R:
+            attempt = 0
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except error_connection as error:
+                    attempt += 1
+                    log_retry(func, error, attempt)
+                    if attempt >= max_attempts:
+                        raise
+                time.sleep(sleep_time(attempt - 1))
 
         return inner
 
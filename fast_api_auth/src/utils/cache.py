@@ -0,0 +1,74 @@
+from typing import Hashable
+
+from cachetools import TTLCache
+
+
+class InstrumentedTTLCache(TTLCache):
+    """Ограниченный TTL/LRU кеш со счетчиками использования.
+
+    Значения кладутся через `store` и читаются через `lookup`. Пока
+    задан `max_age`, записи старше него считаются промахом: так кеш
+    временно работает с коротким TTL, не теряя содержимого.
+
+    Attributes:
+        max_age: Временное ограничение возраста записей в секундах
+        hits: Количество попаданий в кеш
+        misses: Количество промахов
+        evictions: Количество записей, вытесненных из-за переполнения
+        expirations: Количество записей, удаленных по истечении TTL
+
+    Note:
+        Кеш не потокобезопасен и рассчитан на один event loop.
+
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.max_age: float | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def store(self, key: Hashable, value: any) -> None:
+        """Сохраняет значение с отметкой времени записи."""
+        self[key] = (self.timer(), value)
+
+    def lookup(self, key: Hashable) -> any:
+        """Возвращает значение по ключу с учетом попаданий и промахов.
+
+        Returns:
+            Значение из кеша или None, если ключ отсутствует или устарел
+
+        """
+        entry = self.get(key)
+        if entry is not None and self.max_age is not None:
+            if self.timer() - entry[0] > self.max_age:
+                entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def popitem(self) -> tuple[Hashable, any]:
+        """Вытесняет давно не использованную запись."""
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def expire(self, time: float | None = None) -> list[tuple[Hashable, any]]:
+        """Удаляет устаревшие записи."""
+        expired = super().expire(time)
+        self.expirations += len(expired)
+        return expired
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает текущие счетчики кеша."""
+        return {
+            'size': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
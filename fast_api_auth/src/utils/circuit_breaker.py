@@ -0,0 +1,141 @@
+import logging
+import math
+import time
+from enum import Enum
+
+from fastapi import HTTPException, status
+
+
+logger = logging.getLogger(__name__)
+
+
+class BreakerState(str, Enum):
+    """Состояние предохранителя."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(HTTPException):
+    """Зависимость недоступна, запрос отклонен без обращения к ней."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f'Сервис {name} временно недоступен',
+            headers={'Retry-After': str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class CircuitBreaker:
+    """Предохранитель для внешней зависимости (closed/open/half-open).
+
+    После `failure_threshold` ошибок подключения подряд предохранитель
+    размыкается, и запросы сразу получают 503 вместо ожидания таймаутов
+    на недоступном сервисе. Через `recovery_timeout` пропускается одна
+    пробная операция (half-open): успех замыкает предохранитель, ошибка
+    снова размыкает. Если пробная операция не сообщила результат, следующая
+    пропускается еще через `recovery_timeout`.
+
+    Результаты операций сообщают клиенты зависимости через
+    `record_success` и `record_failure`, а проверка `check` выполняется
+    в зависимостях FastAPI до входа в обработчик.
+
+    Attributes:
+        name: Имя зависимости
+        failure_threshold: Количество ошибок подряд до размыкания
+        recovery_timeout: Пауза перед пробной операцией в секундах
+        state: Текущее состояние
+        failures: Ошибки подряд в текущем состоянии
+        opened: Сколько раз предохранитель размыкался
+        rejected: Количество отклоненных запросов
+
+    Note:
+        Предохранитель не потокобезопасен и рассчитан на один event loop.
+
+    """
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int,
+            recovery_timeout: float,
+        ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        breakers[name] = self
+
+    def allow(self) -> bool:
+        """Решает, можно ли обратиться к зависимости.
+
+        Returns:
+            bool: True в замкнутом состоянии и для пробной операции
+
+        """
+        if self.state is BreakerState.CLOSED:
+            return True
+        now = time.monotonic()
+        if now - self._opened_at < self.recovery_timeout:
+            return False
+        self.state = BreakerState.HALF_OPEN
+        self._opened_at = now
+        return True
+
+    def check(self) -> None:
+        """Пропускает запрос или отклоняет его, пока зависимость недоступна.
+
+        Raises:
+            CircuitOpenError: 503 с `Retry-After`, если предохранитель
+                разомкнут
+
+        """
+        if self.allow():
+            return
+        self.rejected += 1
+        raise CircuitOpenError(
+            self.name,
+            self.recovery_timeout - (time.monotonic() - self._opened_at),
+        )
+
+    def record_success(self) -> None:
+        """Отмечает успешную операцию."""
+        if self.state is not BreakerState.CLOSED:
+            logger.info(f'Зависимость {self.name} снова доступна')
+            self.state = BreakerState.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """Отмечает ошибку подключения к зависимости."""
+        self.failures += 1
+        if (
+            self.state is BreakerState.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            if self.state is not BreakerState.OPEN:
+                self.opened += 1
+                logger.warning(
+                    f'Зависимость {self.name} недоступна, запросы '
+                    f'отклоняются на {self.recovery_timeout} секунд'
+                )
+            self.state = BreakerState.OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, int | str]:
+        """Возвращает состояние и счетчики предохранителя."""
+        return {
+            'state': self.state.value,
+            'failures': self.failures,
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
+
+
+"""Все созданные предохранители по имени зависимости."""
+breakers: dict[str, CircuitBreaker] = {}